@@ -27,7 +27,7 @@ def effect_nerdy_server_optimization(db: Session, player_id: int, card_id: int):
 
     # Execute: Free upgrade (no cost deducted)
     player.compute_level = next_level
-    db.commit()
+    db.flush()
 
     return {
         "success": True,
@@ -52,7 +52,7 @@ def effect_hire_a_lobbyist(db: Session, player_id: int, card_id: int):
 
     # Recalculate income since power changed
     update_player_income(db, player)
-    db.commit()
+    db.flush()
 
     return {
         "success": True,
@@ -1,6 +1,11 @@
 # Compute Level costs and requirements
 from backend.enums import CardCategory
 
+# --- Event Log (see backend/event_log.py) ---
+# A full snapshot is stored every this many events, so recovery never
+# replays more than this many commands.
+SNAPSHOT_EVERY = 50
+
 COMPUTE_UPGRADE_COSTS = {2: 2, 3: 3, 4: 4, 5: 5, 6: 6, 7: 7}
 # 0 = Startup, 1 = Millionaire, 2 = Billionaire
 COMPUTE_NET_WORTH_REQ = {
@@ -93,6 +98,54 @@ REPUTATION_TILE_POOL = {
     ],
 }
 
+# What each tile effect does, as additions to a player's modifiers. Effects
+# stack by adding up, and a flag is on when its total is above 0. Compiled
+# into vectors by backend/modifiers.py, which checks every tile in the pool
+# has an entry here.
+MODIFIER_DEFAULTS = {
+    "model_worker_cost_offset": 0,
+    "compute_cost_offset": 0,
+    "hand_limit": 5,
+    "income_offset": 0,
+    "draw_bonus": 0,
+    "play_card_worker_offset": 0,
+    "effect_slots": 3,  # Active effect card slots
+    "round_discards": 0,  # Cards discarded from hand when the round resolves
+    "round_power_offset": 0,  # Power gained (or lost) when the round resolves
+    "worker_income_efficiency": False,
+    "free_card_play": False,
+    "priority_p1": False,
+}
+TILE_EFFECTS = {
+    # Level 0 penalties
+    "model_cost_plus_1": {"model_worker_cost_offset": 1},
+    "compute_cost_plus_3": {"compute_cost_offset": 3},
+    "discard_per_round": {"round_discards": 1},
+    "hand_limit_3": {"hand_limit": -2},
+    "lose_2_power_round": {"round_power_offset": -2},
+    # Levels 1-3
+    "income_plus_1": {"income_offset": 1},
+    "draw_extra_card": {"draw_bonus": 1},
+    "hand_limit_6": {"hand_limit": 1},
+    "compute_minus_1": {"compute_cost_offset": -1},
+    "income_plus_2": {"income_offset": 2},
+    "compute_minus_2": {"compute_cost_offset": -2},
+    "play_card_worker_minus_1": {"play_card_worker_offset": -1},
+    "model_worker_minus_1": {"model_worker_cost_offset": -1},
+    "free_hand_card": {"free_card_play": 1},
+    "perma_p1": {"priority_p1": 1},
+    "free_active_effect": {"effect_slots": 1},
+    "one_worker_income": {"worker_income_efficiency": 1},
+}
+
+# Reputation needed to claim a tile of each level (level 0 is the -3 penalty)
+REPUTATION_TILE_MIN_REP = {1: 1, 2: 6, 3: 10}
+# Net Worth needed to claim a tile of each level
+REPUTATION_TILE_NET_WORTH_REQ = {2: 1, 3: 2}
+# When True, actions skip the tile check and every tile is recomputed once
+# when the round resolves (see recompute_reputation_tiles)
+REPUTATION_TILES_AT_ROUND_END = False
+
 # Assuming CardCategory is already imported or defined in your config
 CARD_LIBRARY = [
     {
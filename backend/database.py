@@ -1,32 +1,257 @@
+import asyncio
+import contextlib
+import contextvars
+import functools
 import os
-from sqlalchemy import create_engine
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from backend.models import Base  # Importing the Base class you defined
 
 # 1. Define the Database URL
+# Any SQLAlchemy URL works; the bundled SQLite file is the default.
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 db_path = os.path.join(BASE_DIR, "disruptopia.db")
-SQLALCHEMY_DATABASE_URL = f"sqlite:///{db_path}"
+SQLALCHEMY_DATABASE_URL = os.getenv("DISRUPTOPIA_DATABASE_URL", f"sqlite:///{db_path}")
+
+# Connection pool settings (ignored by SQLite's in-memory pools)
+DB_POOL_SIZE = int(os.getenv("DISRUPTOPIA_DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DISRUPTOPIA_DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DISRUPTOPIA_DB_POOL_TIMEOUT", "30"))
+DB_ECHO = os.getenv("DISRUPTOPIA_DB_ECHO", "0") == "1"
+
+# SQLite tuning, applied to every new connection.
+# WAL lets readers keep going while a writer commits, and NORMAL only
+# fsyncs at checkpoints, which is safe in WAL mode.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("DISRUPTOPIA_SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("DISRUPTOPIA_SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("DISRUPTOPIA_SQLITE_MMAP_SIZE", str(256 * 1024**2))),
+    # Negative values are KiB, so this is a 64 MiB page cache
+    "cache_size": int(os.getenv("DISRUPTOPIA_SQLITE_CACHE_SIZE", "-65536")),
+    "busy_timeout": int(os.getenv("DISRUPTOPIA_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+}
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def create_db_engine(database_url: str = SQLALCHEMY_DATABASE_URL) -> Engine:
+    """
+    Builds an engine with the configured pool settings. SQLite engines also
+    get the SQLITE_PRAGMAS applied on connect.
+    """
+    url = make_url(database_url)
+    kwargs = {"echo": DB_ECHO}
+    if url.get_backend_name() == "sqlite":
+        # 'check_same_thread' is only needed for SQLite to allow multi-user access
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if not _is_memory_sqlite(url):
+        kwargs.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+
+    new_engine = create_engine(url, **kwargs)
+    if url.get_backend_name() == "sqlite":
+        event.listen(new_engine, "connect", _apply_sqlite_pragmas)
+    return new_engine
+
+
+def create_memory_engine() -> Engine:
+    """
+    A private in-memory SQLite database. Every thread shares its single
+    connection, so sessions in worker threads see the same tables.
+    """
+    return create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def describe_database(bind: Engine = None) -> dict:
+    """Reports the settings actually in effect, for the startup log."""
+    bind = bind or engine
+    report = {
+        "url": bind.url.render_as_string(hide_password=True),
+        "pool": bind.pool.status(),
+    }
+    if bind.dialect.name == "sqlite":
+        with bind.connect() as conn:
+            for name in SQLITE_PRAGMAS:
+                report[name] = conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+    return report
+
 
 # 2. Create the Engine
-# 'check_same_thread' is only needed for SQLite to allow multi-user access
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = create_db_engine()
 
 # 3. Create a Session Factory
 # This allows us to create 'instances' of database connections
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def finish_command(db, result: dict) -> dict:
+    """
+    Ends one command's unit of work. Engine helpers only flush, so the
+    caller commits exactly once here, or rolls back if the command failed.
+    """
+    if "error" in result:
+        db.rollback()
+    else:
+        db.commit()
+    return result
+
+
+# 4. Bounded pool for blocking engine calls made from async handlers, so a
+# slow commit never runs on (and stalls) the event loop.
+DB_THREADS = int(os.getenv("DISRUPTOPIA_DB_THREADS", "8"))
+_db_executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="db")
+
+
+def _call_with_session(fn, args, kwargs):
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+async def run_in_session(fn, *args, **kwargs):
+    """
+    Awaits fn(db, *args, **kwargs) on the DB thread pool with a session that
+    lives only inside that worker thread. The caller's context variables
+    (e.g. the request's metrics) come along.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _db_executor,
+        context.run,
+        functools.partial(_call_with_session, fn, args, kwargs),
+    )
+
+
+# Per-thread count of SQL statements sent to any engine. Callers diff two
+# readings of queries_issued() to measure the cost of a block of work.
+_query_stats = threading.local()
+# Statements issued inside counting_queries(), which may span threads
+_context_queries: contextvars.ContextVar = contextvars.ContextVar(
+    "context_queries", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    _query_stats.count = getattr(_query_stats, "count", 0) + 1
+    counter = _context_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def queries_issued() -> int:
+    """Total statements executed on the current thread so far."""
+    return getattr(_query_stats, "count", 0)
+
+
+@contextlib.contextmanager
+def counting_queries():
+    """
+    Counts the statements issued inside the block into a one-item list.
+    Unlike queries_issued(), this includes worker threads the context is
+    copied into (see run_in_session), so it covers a whole request.
+    """
+    counter = [0]
+    token = _context_queries.set(counter)
+    try:
+        yield counter
+    finally:
+        _context_queries.reset(token)
+
+
+class SchemaOutOfDate(RuntimeError):
+    """The database was created by an older version of the models."""
+
+
+def schema_problems(bind: Engine = None) -> list[str]:
+    """Tables, columns and indexes the models define but the database lacks."""
+    bind = bind or engine
+    inspector = inspect(bind)
+    existing = set(inspector.get_table_names())
+    problems = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            problems.append(f"table {table.name}")
+            continue
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        problems += [
+            f"column {table.name}.{c.name}" for c in table.c if c.name not in columns
+        ]
+        indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        problems += [f"index {i.name}" for i in table.indexes if i.name not in indexes]
+    return problems
+
+
+def check_schema(bind: Engine = None):
+    """Fails fast, with the fix in the message, if the schema is stale."""
+    problems = schema_problems(bind)
+    if problems:
+        raise SchemaOutOfDate(
+            "The database schema is out of date; missing "
+            + ", ".join(problems)
+            + ". Run `python -m backend.database` to upgrade it."
+        )
+
+
+def upgrade_schema(bind: Engine = None):
+    """
+    Brings an existing database up to the models without losing rows:
+    creates missing tables, adds missing columns (with their scalar default
+    for existing rows) and creates missing indexes.
+    """
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.c:
+                if column.name in columns:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                ddl += column.type.compile(dialect=bind.dialect)
+                if column.default is not None and column.default.is_scalar:
+                    ddl += f" DEFAULT {column.default.arg!r}"
+                conn.execute(text(ddl))
+            indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
+
+
 def init_db():
     """
-    This function creates the tables in the SQLite file.
-    It reads the 'Base' metadata from models.py.
+    This function creates the tables in the SQLite file, or upgrades the
+    ones an older version created. It reads the 'Base' metadata from models.py.
     """
     print("Initializing the Disruptopia database...")
-    Base.metadata.create_all(bind=engine)
+    upgrade_schema()
     print("Tables created successfully!")
+    print(f"Database settings: {describe_database()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,97 @@
+import random
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from backend.deltas import record_card_move
+from backend.models import Component, Game
+
+
+def deck_rng(game: Game, deck_zone: str) -> random.Random:
+    """
+    Returns the RNG for the game's next shuffle. Seeded from the game's seed
+    and shuffle counter, so a game's card order is reproducible.
+    """
+    rng = random.Random(f"{game.rng_seed}:{deck_zone}:{game.shuffle_count}")
+    game.shuffle_count += 1
+    return rng
+
+
+def discard_zone_for(deck_zone: str) -> str:
+    """research_deck -> research_discard"""
+    return deck_zone.removesuffix("_deck") + "_discard"
+
+
+def deck_order(game: Game, deck_zone: str, count: int) -> list[int]:
+    """A shuffled list of the positions 0..count-1 for the game's next shuffle."""
+    order = list(range(count))
+    deck_rng(game, deck_zone).shuffle(order)
+    return order
+
+
+def shuffle_positions(game: Game, deck_zone: str, cards: list):
+    """Assigns a shuffled deck position to each (not yet stored) card."""
+    for card, position in zip(cards, deck_order(game, deck_zone, len(cards))):
+        card.position = position
+
+
+def pop_top_card(db: Session, game_id: int, deck_zone: str, values: dict):
+    """
+    Moves the top card of a deck with a single indexed UPDATE ... RETURNING.
+    Returns the card id, or None if the deck is empty.
+    """
+    top = (
+        select(Component.id)
+        .where(Component.game_id == game_id, Component.zone == deck_zone)
+        .order_by(Component.position)
+        .limit(1)
+        .scalar_subquery()
+    )
+    card_id = db.execute(
+        update(Component)
+        .where(Component.id == top)
+        .values(position=None, **values)
+        .returning(Component.id)
+        .execution_options(synchronize_session="fetch")
+    ).scalar()
+    if card_id is not None:
+        record_card_move(db, game_id, card_id, **values)
+    return card_id
+
+
+def reshuffle_discard(db: Session, game: Game, deck_zone: str) -> int:
+    """
+    Shuffles the deck's discard pile back into the deck with one bulk
+    UPDATE. Returns the number of cards returned to the deck.
+    """
+    card_ids = db.scalars(
+        select(Component.id)
+        .where(
+            Component.game_id == game.id,
+            Component.zone == discard_zone_for(deck_zone),
+        )
+        .order_by(Component.id)
+    ).all()
+    if not card_ids:
+        return 0
+
+    order = list(range(len(card_ids)))
+    deck_rng(game, deck_zone).shuffle(order)
+    table = Component.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("card_id"))
+        .values(zone=deck_zone, owner_id=None, position=bindparam("new_position")),
+        [
+            {"card_id": card_id, "new_position": position}
+            for card_id, position in zip(card_ids, order)
+        ],
+    )
+    # The Core update bypassed the identity map; reload any loaded cards
+    for card_id in card_ids:
+        record_card_move(db, game.id, card_id, zone=deck_zone)
+        card = db.identity_map.get(identity_key(Component, card_id))
+        if card is not None:
+            db.expire(card)
+    return len(card_ids)
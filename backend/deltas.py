@@ -0,0 +1,236 @@
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session
+
+from backend.models import (
+    Component,
+    Game,
+    Player,
+    Presence,
+    RegionState,
+    ReputationTile,
+    WorkerPlacement,
+)
+
+# Columns whose changes are pushed to clients
+PLAYER_FIELDS = (
+    "user_name",
+    "corporate_funds",
+    "personal_funds",
+    "reputation",
+    "net_worth_level",
+    "compute_level",
+    "model_version",
+    "presence_count",
+    "total_workers",
+    "power",
+    "subsidy_tokens",
+    "income",
+    "vp",
+)
+GAME_FIELDS = ("game_phase", "p1_token_index", "millionaire_count", "billionaire_count")
+
+
+class StateDelta:
+    """
+    Everything one commit changed in one game. Clients holding version N
+    apply the delta for version N + 1; any other version means they missed
+    something and should refetch /game/{game_id}/state.
+    """
+
+    __slots__ = (
+        "game_id",
+        "version",
+        "game",
+        "players",
+        "placements_added",
+        "placements_removed",
+        "placements_cleared",
+        "cards_moved",
+        "tiles",
+        "regions",
+        "presence_added",
+    )
+
+    def __init__(self, game_id: int):
+        self.game_id = game_id
+        self.version = None
+        self.game: dict[str, object] = {}
+        self.players: dict[int, dict[str, object]] = {}
+        self.placements_added: list[dict] = []
+        self.placements_removed: list[dict] = []
+        self.placements_cleared = False
+        self.cards_moved: dict[int, dict] = {}
+        self.tiles: dict[int, int] = {}
+        self.regions: dict[int, int] = {}
+        self.presence_added: list[dict] = []
+
+    def __bool__(self):
+        return any(
+            (
+                self.game,
+                self.players,
+                self.placements_added,
+                self.placements_removed,
+                self.placements_cleared,
+                self.cards_moved,
+                self.tiles,
+                self.regions,
+                self.presence_added,
+            )
+        )
+
+    def clear_placements(self):
+        """
+        Every placement was removed. Clients clear before applying the adds,
+        so adds and removes recorded earlier in the transaction are dropped.
+        """
+        self.placements_cleared = True
+        self.placements_added.clear()
+        self.placements_removed.clear()
+
+    def to_message(self) -> dict:
+        return {
+            "type": "STATE_DELTA",
+            "game_id": self.game_id,
+            "version": self.version,
+            "game": self.game,
+            "players": self.players,
+            "placements_added": self.placements_added,
+            "placements_removed": self.placements_removed,
+            "placements_cleared": self.placements_cleared,
+            "cards_moved": list(self.cards_moved.values()),
+            "tiles": self.tiles,
+            "regions": self.regions,
+            "presence_added": self.presence_added,
+        }
+
+
+# ==========================================
+# 1. RECORDING
+# ==========================================
+
+
+def pending_delta(session: Session, game_id: int) -> StateDelta:
+    """The delta being built for the game in the session's open transaction."""
+    pending = session.info.setdefault("pending_deltas", {})
+    if game_id not in pending:
+        pending[game_id] = StateDelta(game_id)
+    return pending[game_id]
+
+
+def record_card_move(session: Session, game_id: int, card_id: int, **values):
+    """For bulk statements that move cards without going through a flush."""
+    pending_delta(session, game_id).cards_moved[card_id] = {
+        "id": card_id,
+        "zone": values["zone"],
+        "owner_id": values.get("owner_id"),
+    }
+
+
+def _changed(obj, fields) -> dict:
+    attrs = inspect(obj).attrs
+    return {
+        name: getattr(obj, name) for name in fields if attrs[name].history.has_changes()
+    }
+
+
+def _placement(p: WorkerPlacement) -> dict:
+    return {
+        "player_id": p.player_id,
+        "worker_number": p.worker_number,
+        "action_type": p.action_type,
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, Player):
+            delta = pending_delta(session, obj.game_id)
+            delta.players[obj.id] = {n: getattr(obj, n) for n in PLAYER_FIELDS}
+        elif isinstance(obj, WorkerPlacement):
+            pending_delta(session, obj.game_id).placements_added.append(_placement(obj))
+        elif isinstance(obj, Presence):
+            with session.no_autoflush:
+                player = session.get(Player, obj.player_id)
+            pending_delta(session, player.game_id).presence_added.append(
+                {"player_id": obj.player_id, "region_id": obj.region_id}
+            )
+
+    for obj in session.dirty:
+        if isinstance(obj, Player):
+            changes = _changed(obj, PLAYER_FIELDS)
+            if changes:
+                delta = pending_delta(session, obj.game_id)
+                delta.players.setdefault(obj.id, {}).update(changes)
+        elif isinstance(obj, Game):
+            changes = _changed(obj, GAME_FIELDS)
+            if changes:
+                pending_delta(session, obj.id).game.update(changes)
+        elif isinstance(obj, WorkerPlacement):
+            if _changed(obj, ("action_type",)):
+                pending_delta(session, obj.game_id).placements_added.append(
+                    _placement(obj)
+                )
+        elif isinstance(obj, Component):
+            if _changed(obj, ("zone", "owner_id")):
+                record_card_move(
+                    session, obj.game_id, obj.id, zone=obj.zone, owner_id=obj.owner_id
+                )
+        elif isinstance(obj, ReputationTile):
+            if _changed(obj, ("owner_id",)):
+                pending_delta(session, obj.game_id).tiles[obj.id] = obj.owner_id
+        elif isinstance(obj, RegionState):
+            if _changed(obj, ("subsidy_tokens_remaining",)):
+                delta = pending_delta(session, obj.game_id)
+                delta.regions[obj.region_id] = obj.subsidy_tokens_remaining
+
+    for obj in session.deleted:
+        if isinstance(obj, WorkerPlacement):
+            pending_delta(session, obj.game_id).placements_removed.append(
+                {"player_id": obj.player_id, "worker_number": obj.worker_number}
+            )
+
+
+# ==========================================
+# 2. VERSIONING & PUBLISHING
+# ==========================================
+
+
+@event.listens_for(Session, "before_commit")
+def _stamp_versions(session):
+    # Flush now so the final flush's changes land in this commit's deltas
+    session.flush()
+    pending = session.info.pop("pending_deltas", {})
+    stamped = session.info.setdefault("stamped_deltas", [])
+    for game_id, delta in pending.items():
+        if not delta:
+            continue
+        delta.version = session.execute(
+            update(Game)
+            .where(Game.id == game_id)
+            .values(state_version=Game.state_version + 1)
+            .returning(Game.state_version)
+        ).scalar()
+        if delta.version is not None:
+            stamped.append(delta)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_committed(session):
+    committed = session.info.setdefault("committed_deltas", [])
+    committed.extend(session.info.pop("stamped_deltas", []))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_uncommitted(session):
+    session.info.pop("pending_deltas", None)
+    session.info.pop("stamped_deltas", None)
+
+
+def pop_committed(session: Session) -> list[dict]:
+    """
+    Returns (and forgets) the delta messages for everything this session has
+    committed so far, oldest first, ready to push to clients.
+    """
+    return [d.to_message() for d in session.info.pop("committed_deltas", [])]
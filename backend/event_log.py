@@ -0,0 +1,385 @@
+import functools
+import inspect
+import json
+import zlib
+from enum import Enum
+from typing import Iterator, NamedTuple
+
+from sqlalchemy import (
+    delete,
+    event,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.config import SNAPSHOT_EVERY
+from backend.database import create_memory_engine
+from backend.models import (
+    Base,
+    CardDetails,
+    Component,
+    Game,
+    GameEvent,
+    GameSnapshot,
+    LeaderboardEntry,
+    Player,
+    Presence,
+    RegionState,
+    ReputationTile,
+    WorkerPlacement,
+)
+
+# Engine commands by name, filled in by @logged_command
+COMMANDS: dict[str, callable] = {}
+
+
+class ReplayStep(NamedTuple):
+    seq: int
+    command: str
+    args: dict
+    result: dict
+    # The replay's private session, holding the state right after this step
+    session: Session
+
+
+# ==========================================
+# 1. RECORDING
+# ==========================================
+
+
+def _game_id_for(db: Session, args: dict):
+    """Works out which game a command touches from its arguments."""
+    if "game_id" in args:
+        return args["game_id"]
+    if "player_id" in args:
+        player = db.get(Player, args["player_id"])
+        return player.game_id if player else None
+    for key in ("card_id", "component_id"):
+        if key in args:
+            card = db.get(Component, args[key])
+            return card.game_id if card else None
+    return None
+
+
+def _next_seq(db: Session, game_id: int) -> int:
+    """
+    Claims the game's next event number. The transaction's first command
+    bumps games.last_event_seq; that UPDATE takes the database's write lock,
+    so a concurrent command on the same game waits for this transaction and
+    then gets the next number, instead of reading the same max(seq). Later
+    commands in the transaction count on in memory, and the counter is
+    brought up to date at commit. Taking the max with the log covers
+    databases upgraded from before the counter existed.
+    """
+    seqs = db.info.setdefault("event_seqs", {})
+    if game_id in seqs:
+        seqs[game_id][1] += 1
+        return seqs[game_id][1]
+
+    seq = db.execute(
+        update(Game)
+        .where(Game.id == game_id)
+        .values(
+            last_event_seq=func.max(
+                Game.last_event_seq,
+                select(func.coalesce(func.max(GameEvent.seq), 0))
+                .where(GameEvent.game_id == game_id)
+                .scalar_subquery(),
+            )
+            + 1
+        )
+        .returning(Game.last_event_seq)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+    if seq == 1 and _latest_snapshot(db, game_id) is None:
+        # First command ever: keep the starting state so replay has a base
+        take_snapshot(db, game_id, 0)
+    # [first claimed, last claimed, value stored in games.last_event_seq]
+    seqs[game_id] = [seq, seq, seq]
+    return seq
+
+
+def logged_command(fn):
+    """
+    Registers an engine command and appends it to its game's event log in
+    the same transaction that applies it. Only the outermost command is
+    logged (a round's actions replay as part of the round), and commands
+    that return an error are dropped from the log.
+    """
+    signature = inspect.signature(fn)
+    COMMANDS[fn.__name__] = fn
+
+    @functools.wraps(fn)
+    def wrapper(db: Session, *args, **kwargs):
+        depth = db.info.get("command_depth", 0)
+        if depth or db.info.get("replaying"):
+            return fn(db, *args, **kwargs)
+
+        bound = signature.bind(db, *args, **kwargs)
+        bound.apply_defaults()
+        call_args = {
+            name: value.value if isinstance(value, Enum) else value
+            for name, value in list(bound.arguments.items())[1:]
+        }
+        game_id = _game_id_for(db, call_args)
+        entry = None
+        if game_id is not None:
+            entry = GameEvent(
+                game_id=game_id,
+                seq=_next_seq(db, game_id),
+                command=fn.__name__,
+                args=json.dumps(call_args, separators=(",", ":")),
+            )
+            db.add(entry)
+
+        db.info["command_depth"] = depth + 1
+        try:
+            result = fn(db, *args, **kwargs)
+        finally:
+            db.info["command_depth"] = depth
+
+        if entry is not None and isinstance(result, dict) and "error" in result:
+            _unlog(db, entry)
+        return result
+
+    return wrapper
+
+
+def _unlog(db: Session, entry: GameEvent):
+    if entry in db.new:
+        db.expunge(entry)
+    else:
+        db.delete(entry)
+        db.flush()
+    # Hand the number back; last < first means nothing was logged
+    db.info["event_seqs"][entry.game_id][1] -= 1
+
+
+@event.listens_for(Session, "before_commit")
+def _snapshot_on_commit(session):
+    seqs = session.info.pop("event_seqs", {})
+    if not seqs:
+        return
+    session.flush()
+    for game_id, (first, last, stored) in seqs.items():
+        if last != stored:
+            session.execute(
+                update(Game)
+                .where(Game.id == game_id)
+                .values(last_event_seq=last)
+                .execution_options(synchronize_session=False)
+            )
+        # Snapshot whenever this transaction crossed a multiple of SNAPSHOT_EVERY
+        if last // SNAPSHOT_EVERY > (first - 1) // SNAPSHOT_EVERY:
+            take_snapshot(session, game_id, last)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_event_seqs(session):
+    session.info.pop("event_seqs", None)
+    session.info.pop("command_depth", None)
+
+
+# ==========================================
+# 2. SNAPSHOTS
+# ==========================================
+
+
+def _game_rows(db: Session, game_id: int) -> dict[str, list[dict]]:
+    """Every row that makes up the game, keyed by table, as plain dicts."""
+    game_players = select(Player.id).where(Player.game_id == game_id)
+    queries = {
+        "games": select(Game.__table__).where(Game.id == game_id),
+        "players": select(Player.__table__).where(Player.game_id == game_id),
+        "card_details": select(CardDetails.__table__).where(
+            CardDetails.id.in_(
+                select(Component.card_details_id).where(Component.game_id == game_id)
+            )
+        ),
+        "region_states": select(RegionState.__table__).where(
+            RegionState.game_id == game_id
+        ),
+        "reputation_tiles": select(ReputationTile.__table__).where(
+            ReputationTile.game_id == game_id
+        ),
+        "components": select(Component.__table__).where(Component.game_id == game_id),
+        "worker_placements": select(WorkerPlacement.__table__).where(
+            WorkerPlacement.game_id == game_id
+        ),
+        "presence": select(Presence.__table__).where(
+            Presence.player_id.in_(game_players)
+        ),
+    }
+    return {
+        table: [dict(row._mapping) for row in db.execute(query)]
+        for table, query in queries.items()
+    }
+
+
+def take_snapshot(db: Session, game_id: int, seq: int):
+    """Stores the game's current state as of event number seq."""
+    db.flush()
+    state = json.dumps(_game_rows(db, game_id), separators=(",", ":"))
+    db.execute(
+        insert(GameSnapshot).values(
+            game_id=game_id, seq=seq, state=zlib.compress(state.encode())
+        )
+    )
+
+
+def restore_snapshot(db: Session, game_id: int, snapshot: GameSnapshot):
+    """
+    Replaces the game's rows with the snapshot's, keeping their ids so the
+    log's arguments still point at the right players and cards. Card
+    definitions are only added if missing. Flushes only; the caller commits.
+    """
+    # Local import to break circular dependency
+    from backend.game_engine import invalidate_modifier_cache, invalidate_presence_cache
+    from backend.leaderboard import refresh_leaderboard
+
+    rows = json.loads(zlib.decompress(snapshot.state))
+    game_players = select(Player.id).where(Player.game_id == game_id)
+
+    db.flush()
+    db.execute(delete(Presence).where(Presence.player_id.in_(game_players)))
+    for model in (
+        WorkerPlacement,
+        Component,
+        ReputationTile,
+        RegionState,
+        LeaderboardEntry,
+        Player,
+    ):
+        db.execute(delete(model).where(model.game_id == game_id))
+    db.execute(delete(Game).where(Game.id == game_id))
+
+    known_cards = set(db.scalars(select(CardDetails.id)))
+    rows["card_details"] = [
+        r for r in rows["card_details"] if r["id"] not in known_cards
+    ]
+    for table in Base.metadata.sorted_tables:
+        if rows.get(table.name):
+            db.execute(insert(table), rows[table.name])
+
+    # Bulk statements skip the ORM: drop anything stale for this game
+    db.expire_all()
+    refresh_leaderboard(db, game_id)
+    invalidate_modifier_cache(db)
+    invalidate_presence_cache(db)
+
+
+# ==========================================
+# 3. REPLAY & RECOVERY
+# ==========================================
+
+
+def iter_events(
+    db: Session, game_id: int, after_seq: int = 0, up_to: int = None
+) -> Iterator[GameEvent]:
+    """Streams a game's logged commands in order, a batch at a time."""
+    query = select(GameEvent).where(
+        GameEvent.game_id == game_id, GameEvent.seq > after_seq
+    )
+    if up_to is not None:
+        query = query.where(GameEvent.seq <= up_to)
+    yield from db.scalars(
+        query.order_by(GameEvent.seq).execution_options(yield_per=100)
+    )
+
+
+def apply_event(db: Session, entry: GameEvent) -> dict:
+    """Re-runs one logged command without logging it again."""
+    fn = COMMANDS[entry.command]
+    args = json.loads(entry.args)
+    for name, param in inspect.signature(fn).parameters.items():
+        if name in args and isinstance(param.annotation, type):
+            if issubclass(param.annotation, Enum) and args[name] is not None:
+                args[name] = param.annotation(args[name])
+
+    replaying = db.info.get("replaying")
+    db.info["replaying"] = True
+    try:
+        return fn(db, **args)
+    finally:
+        db.info["replaying"] = replaying
+
+
+def _latest_snapshot(db: Session, game_id: int, up_to: int = None):
+    query = select(GameSnapshot).where(GameSnapshot.game_id == game_id)
+    if up_to is not None:
+        query = query.where(GameSnapshot.seq <= up_to)
+    return db.scalars(query.order_by(GameSnapshot.seq.desc()).limit(1)).first()
+
+
+def recover_game(db: Session, game_id: int, up_to: int = None) -> dict:
+    """
+    Rebuilds a game in place from its latest snapshot (at or before up_to)
+    plus the tail of its log, as one transaction: if any event fails to
+    replay, everything is rolled back and the game is left as it was.
+    """
+    snapshot = _latest_snapshot(db, game_id, up_to)
+    if snapshot is None:
+        return {"error": "No snapshot for this game."}
+    from_seq = snapshot.seq
+    version = db.scalar(select(Game.state_version).where(Game.id == game_id)) or 0
+
+    try:
+        restore_snapshot(db, game_id, snapshot)
+        applied = 0
+        for entry in list(iter_events(db, game_id, from_seq, up_to)):
+            apply_event(db, entry)
+            applied += 1
+
+        # Move the version past anything clients have seen so they all refetch
+        db.execute(
+            update(Game)
+            .where(Game.id == game_id)
+            .values(state_version=func.max(Game.state_version, version) + 1)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {
+        "action": "game_recovered",
+        "snapshot_seq": from_seq,
+        "events_replayed": applied,
+    }
+
+
+def replay(db: Session, game_id: int, up_to: int = None) -> Iterator[ReplayStep]:
+    """
+    Streams a game's history from its first snapshot, one command at a time.
+    The commands run against a private in-memory database, so the live game
+    is never touched. Each step's session holds the state right after that
+    step; it is one copy that changes as the replay advances.
+    """
+    scratch_engine = create_memory_engine()
+    Base.metadata.create_all(bind=scratch_engine)
+    scratch = sessionmaker(autoflush=False, bind=scratch_engine)()
+    scratch.info["replaying"] = True
+
+    try:
+        first = db.scalars(
+            select(GameSnapshot)
+            .where(GameSnapshot.game_id == game_id)
+            .order_by(GameSnapshot.seq)
+            .limit(1)
+        ).first()
+        if first is None:
+            return
+        restore_snapshot(scratch, game_id, first)
+        scratch.commit()
+
+        for entry in iter_events(db, game_id, first.seq, up_to):
+            result = apply_event(scratch, entry)
+            scratch.commit()
+            yield ReplayStep(
+                entry.seq, entry.command, json.loads(entry.args), result, scratch
+            )
+    finally:
+        scratch.close()
+        scratch_engine.dispose()
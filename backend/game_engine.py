@@ -1,16 +1,28 @@
-from sqlalchemy import func
+import time
+
+from sqlalchemy import bindparam, event, func, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
 
+from backend import modifiers
 from backend.config import (
     COMPUTE_UPGRADE_COSTS,
     COMPUTE_NET_WORTH_REQ,
     MODEL_NET_WORTH_REQ,
-    WORLD_MAP,
     NET_WORTH_COSTS,
     RECRUIT_COSTS,
     MODEL_WORKER_COSTS,
     MARKETING_BONUSES,
+    REPUTATION_TILE_MIN_REP,
+    REPUTATION_TILE_NET_WORTH_REQ,
+    REPUTATION_TILES_AT_ROUND_END,
 )
+from backend.database import queries_issued
+from backend.decks import pop_top_card, reshuffle_discard
+from backend.deltas import pending_delta
+from backend.event_log import logged_command
+from backend.leaderboard import read_leaderboard
+from backend.metrics import timed_command
 from backend.models import (
     Component,
     Player,
@@ -21,59 +33,131 @@ from backend.models import (
     ReputationTile,
 )
 from backend.seed import ZoneType
+from backend.tracing import traced
+from backend.world_map import WORLD, regions_in
 
 # ==========================================
 # 1. CORE UTILITIES & HELPERS
 # ==========================================
 
 
+# Modifiers only depend on which Reputation Tiles a player owns. They are
+# cached per session, as {player_id: mods} in db.info, and dropped when the
+# transaction ends or tile ownership changes (see check_reputation_tiles).
+# A new transaction always recomputes, so another process moving a tile can
+# never leave this one with stale modifiers. What each tile does is data
+# (TILE_EFFECTS in config), summed by backend/modifiers.py.
+
+
+def invalidate_modifier_cache(db: Session):
+    """Drops the modifiers cached in this session."""
+    db.info.pop("modifiers", None)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _forget_modifiers(session):
+    invalidate_modifier_cache(session)
+
+
+@traced
 def get_player_modifiers(db: Session, player_id: int):
     """
     Returns a dictionary of active buffs and penalties for the player.
+    Results are cached for the rest of the transaction, so only the first
+    lookup per player runs a query.
     """
-    mods = {
-        "model_worker_cost_offset": 0,
-        "compute_cost_offset": 0,
-        "hand_limit": 5,
-        "income_offset": 0,
-        "draw_bonus": 0,
-        "worker_income_efficiency": False,
-        "free_card_play": False,
-        "priority_p1": False,
-    }
+    cache = db.info.setdefault("modifiers", {})
+    if player_id not in cache:
+        cache[player_id] = _compute_player_modifiers(db, player_id)
+    return dict(cache[player_id])
 
-    tiles = db.query(ReputationTile).filter_by(owner_id=player_id).all()
-
-    for tile in tiles:
-        code = tile.effect_code
-        if code == "model_cost_plus_1":
-            mods["model_worker_cost_offset"] += 1
-        elif code == "model_worker_minus_1":
-            mods["model_worker_cost_offset"] -= 1
-        elif code == "compute_cost_plus_3":
-            mods["compute_cost_offset"] += 3
-        elif code == "compute_minus_1":
-            mods["compute_cost_offset"] -= 1
-        elif code == "compute_minus_2":
-            mods["compute_cost_offset"] -= 2
-        elif code == "hand_limit_3":
-            mods["hand_limit"] = min(mods["hand_limit"], 3)
-        elif code == "hand_limit_6":
-            mods["hand_limit"] = 6
-        elif code == "income_plus_1":
-            mods["income_offset"] += 1
-        elif code == "income_plus_2":
-            mods["income_offset"] += 2
-        elif code == "one_worker_income":
-            mods["worker_income_efficiency"] = True
-        elif code == "draw_extra_card":
-            mods["draw_bonus"] += 1
-        elif code == "perma_p1":
-            mods["priority_p1"] = True
-
-    return mods
+
+def _compute_player_modifiers(db: Session, player_id: int):
+    """Builds the modifier dictionary from the player's owned tiles."""
+    codes = db.scalars(
+        select(ReputationTile.effect_code).where(ReputationTile.owner_id == player_id)
+    )
+    return modifiers.as_dict(modifiers.total(codes))
 
 
+def load_game_modifiers(db: Session, *game_ids: int) -> dict:
+    """
+    Every player's modifiers in the given games, from one query, caching
+    them for the rest of the transaction. Returns {player_id: mods}.
+    """
+    evaluated = modifiers.evaluate(
+        db.execute(
+            select(Player.id, ReputationTile.effect_code)
+            .outerjoin(ReputationTile, ReputationTile.owner_id == Player.id)
+            .where(Player.game_id.in_(game_ids))
+        )
+    )
+    db.info.setdefault("modifiers", {}).update(evaluated)
+    return {player_id: dict(mods) for player_id, mods in evaluated.items()}
+
+
+# Each player's regions, and the regions next to them, are kept as bitmasks
+# (see backend/world_map.py) in db.info["presence"] = {player_id: [presence,
+# frontier]}. A game's masks are built from one query the first time the
+# transaction needs them; after that every new Presence row updates them
+# incrementally as it is flushed. Like the modifiers, they are dropped when
+# the transaction ends.
+
+
+def invalidate_presence_cache(db: Session):
+    """Drops the presence masks cached in this session."""
+    db.info.pop("presence", None)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _forget_presence(session):
+    invalidate_presence_cache(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_presence(session, flush_context):
+    cache = session.info.get("presence")
+    if not cache:
+        return
+    for obj in session.new:
+        if isinstance(obj, Presence) and obj.player_id in cache:
+            masks = cache[obj.player_id]
+            masks[:] = WORLD.expand(masks[0], masks[1], obj.region_id)
+    for obj in session.deleted:
+        if isinstance(obj, Presence):
+            invalidate_presence_cache(session)
+            return
+
+
+def presence_masks(db: Session, player: Player) -> tuple[int, int]:
+    """The player's (presence, frontier) region bitmasks."""
+    cache = db.info.setdefault("presence", {})
+    if player.id not in cache:
+        db.flush()
+        held = {}
+        for player_id, region_id in db.execute(
+            select(Player.id, Presence.region_id)
+            .outerjoin(Presence, Presence.player_id == Player.id)
+            .where(Player.game_id == player.game_id)
+        ):
+            held.setdefault(player_id, 0)
+            if region_id is not None:
+                held[player_id] |= 1 << region_id
+        for player_id, presence in held.items():
+            cache[player_id] = [presence, WORLD.frontier(presence)]
+    presence, frontier = cache[player.id]
+    return presence, frontier
+
+
+def expansion_options(db: Session, player_id: int) -> list[int]:
+    """Regions the player could scale into next, ascending."""
+    _, frontier = presence_masks(db, db.get(Player, player_id))
+    return regions_in(frontier)
+
+
+@traced
 def update_player_income(db: Session, player: Player):
     """Calculates and updates player income based on stats and tiles."""
     mods = get_player_modifiers(db, player.id)
@@ -83,49 +167,126 @@ def update_player_income(db: Session, player: Player):
     player.income = min(39, base_income + mods["income_offset"])
 
 
-def check_reputation_tiles(db: Session, player_id: int):
-    """Handles stealing logic and eligibility for Reputation Tiles."""
-    player = db.get(Player, player_id)
-    game_id = player.game_id
-
-    # Level 0 Check (Penalty)
-    current_penalty = (
-        db.query(ReputationTile).filter_by(owner_id=player.id, level=0).first()
-    )
-    if player.reputation == -3 and not current_penalty:
-        available = (
-            db.query(ReputationTile)
-            .filter_by(game_id=game_id, level=0, owner_id=None)
-            .first()
+def _load_tile_standings(db: Session, game_id: int):
+    """
+    Every player's (reputation, net worth) and every tile's level and owner,
+    in two reads. Pending changes are flushed first so the reads see them.
+    """
+    db.flush()
+    stats = {
+        row.id: (row.reputation, row.net_worth_level)
+        for row in db.execute(
+            select(Player.id, Player.reputation, Player.net_worth_level)
+            .where(Player.game_id == game_id)
+            .order_by(Player.reputation, Player.player_order)
         )
-        if available:
-            available.owner_id = player.id
-    elif player.reputation > -3 and current_penalty:
-        current_penalty.owner_id = None
-
-    # Levels 1-3 Stealing/Eligibility
-    for level in [1, 2, 3]:
-        if level == 2 and player.net_worth_level < 1:
-            continue
-        if level == 3 and player.net_worth_level < 2:
-            continue
+    }
+    owners, levels = {}, {}
+    for row in db.execute(
+        select(ReputationTile.id, ReputationTile.level, ReputationTile.owner_id)
+        .where(ReputationTile.game_id == game_id)
+        .order_by(ReputationTile.id)
+    ):
+        owners[row.id] = row.owner_id
+        levels.setdefault(row.level, []).append(row.id)
+    return stats, owners, levels
 
-        min_rep = {1: 1, 2: 6, 3: 10}[level]
-        if player.reputation < min_rep:
-            continue
 
-        tiles = db.query(ReputationTile).filter_by(game_id=game_id, level=level).all()
-        for tile in tiles:
-            if tile.owner_id is None:
-                tile.owner_id = player.id
-                break
-            owner = db.get(Player, tile.owner_id)
-            if player.reputation > owner.reputation:
-                tile.owner_id = player.id
-                break
-    db.commit()
+def _claim_tiles(player_id: int, stats: dict, owners: dict, levels: dict):
+    """
+    Applies one player's tile rules to the in-memory standings: the level 0
+    penalty follows a reputation of -3, and for each level they qualify for
+    they take a free tile, or else steal from the weakest holder they beat.
+    """
+    reputation, net_worth = stats[player_id]
+
+    penalty_tiles = levels.get(0, [])
+    penalty = next((t for t in penalty_tiles if owners[t] == player_id), None)
+    if reputation == -3 and penalty is None:
+        free = next((t for t in penalty_tiles if owners[t] is None), None)
+        if free is not None:
+            owners[free] = player_id
+    elif reputation > -3 and penalty is not None:
+        owners[penalty] = None
+
+    for level, min_rep in REPUTATION_TILE_MIN_REP.items():
+        if net_worth < REPUTATION_TILE_NET_WORTH_REQ.get(level, 0):
+            continue
+        if reputation < min_rep:
+            continue
+        tiles = levels.get(level, [])
+        target = next((t for t in tiles if owners[t] is None), None)
+        if target is None:
+            beaten = [
+                t
+                for t in tiles
+                if owners[t] != player_id and reputation > stats[owners[t]][0]
+            ]
+            target = min(beaten, key=lambda t: stats[owners[t]][0], default=None)
+        if target is not None:
+            owners[target] = player_id
+
+
+def _save_tile_owners(db: Session, game_id: int, before: dict, owners: dict):
+    """Writes the tiles whose owner changed in one bulk update."""
+    moved = [
+        {"tile_id": t, "new_owner": owner}
+        for t, owner in owners.items()
+        if before[t] != owner
+    ]
+    if not moved:
+        return
+    table = ReputationTile.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("tile_id"))
+        .values(owner_id=bindparam("new_owner")),
+        moved,
+    )
+    # The Core update bypassed the identity map; reload any loaded tiles
+    delta = pending_delta(db, game_id)
+    for row in moved:
+        delta.tiles[row["tile_id"]] = row["new_owner"]
+        tile = db.identity_map.get(identity_key(ReputationTile, row["tile_id"]))
+        if tile is not None:
+            db.expire(tile)
+    invalidate_modifier_cache(db)
+
+
+@timed_command
+@traced
+def check_reputation_tiles(db: Session, player_id: int):
+    """
+    Handles stealing logic and eligibility for Reputation Tiles. Skipped
+    when tiles are only recomputed at the end of the round.
+    """
+    if REPUTATION_TILES_AT_ROUND_END:
+        return
+    game_id = db.get(Player, player_id).game_id
+    stats, owners, levels = _load_tile_standings(db, game_id)
+    before = dict(owners)
+    _claim_tiles(player_id, stats, owners, levels)
+    _save_tile_owners(db, game_id, before, owners)
+
+
+@timed_command
+@traced
+def recompute_reputation_tiles(db: Session, game_id: int):
+    """
+    Settles every tile in the game in one pass. Players claim in order of
+    reputation, lowest first, so each contested tile ends with the
+    strongest qualifying player.
+    """
+    stats, owners, levels = _load_tile_standings(db, game_id)
+    before = dict(owners)
+    for player_id in stats:
+        _claim_tiles(player_id, stats, owners, levels)
+    _save_tile_owners(db, game_id, before, owners)
 
 
+@timed_command
+@traced
+@logged_command
 def apply_card_effect(db: Session, player_id: int, card_id: int):
     """
     Identifies the card's effect slug and executes the corresponding logic.
@@ -167,59 +328,14 @@ def calculate_nw_vp(rank: int, player_count: int) -> int:
     return 0
 
 
+@timed_command
+@traced
 def calculate_game_leaderboard(db: Session, game_id: int):
     """
-    Calculates total VP for all players in a game, including
-    competitive ranking bonuses (Personal Funds).
+    Returns total VP for all players in a game, including competitive
+    ranking bonuses (Personal Funds), from the materialized leaderboard.
     """
-    players = db.query(Player).filter(Player.game_id == game_id).all()
-    player_count = len(players)
-
-    # 1. Rank players by Personal Funds for the cash bonus
-    # Sort descending: highest funds first
-    sorted_by_funds = sorted(players, key=lambda p: p.personal_funds, reverse=True)
-
-    fund_bonuses = {}
-    if player_count == 2:
-        fund_bonuses[sorted_by_funds[0].id] = 3
-    elif player_count == 3:
-        fund_bonuses[sorted_by_funds[0].id] = 3
-        fund_bonuses[sorted_by_funds[1].id] = 1
-    elif player_count >= 4:
-        fund_bonuses[sorted_by_funds[0].id] = 3
-        fund_bonuses[sorted_by_funds[1].id] = 2
-        fund_bonuses[sorted_by_funds[2].id] = 1
-
-    leaderboard = []
-    for player in players:
-        # Base VP from race bonuses (Millionaire/Billionaire first-to-finish)
-        total_vp = player.vp
-        # 1. 1VP for each 5 Power
-        total_vp += player.power // 5
-        # 2. 1VP for each Model Version
-        total_vp += player.model_version
-        # 3. 1VP per Region with Presence
-        total_vp += player.presence_count
-        # 4. Personal Funds Ranking Bonus
-        total_vp += fund_bonuses.get(player.id, 0)
-
-        leaderboard.append(
-            {
-                "player_id": player.id,
-                "user_name": player.user_name,
-                "total_vp": total_vp,
-                "breakdown": {
-                    "race_bonuses": player.vp,
-                    "power_vp": player.power // 5,
-                    "model_vp": player.model_version,
-                    "presence_vp": player.presence_count,
-                    "funds_bonus": fund_bonuses.get(player.id, 0),
-                },
-            }
-        )
-
-    # Sort leaderboard by total VP for display
-    return sorted(leaderboard, key=lambda x: x["total_vp"], reverse=True)
+    return read_leaderboard(db, game_id)
 
 
 # ==========================================
@@ -227,6 +343,9 @@ def calculate_game_leaderboard(db: Session, game_id: int):
 # ==========================================
 
 
+@timed_command
+@traced
+@logged_command
 def execute_buy_chips(db: Session, player_id: int):
     """Resolves the Buy Chips action."""
     player = db.get(Player, player_id)
@@ -248,10 +367,13 @@ def execute_buy_chips(db: Session, player_id: int):
 
     player.corporate_funds -= final_cost
     player.compute_level = next_level
-    db.commit()
+    db.flush()
     return {"action": "compute_upgraded", "new_level": player.compute_level}
 
 
+@timed_command
+@traced
+@logged_command
 def execute_train_model(db: Session, player_id: int, worker_count: int = 1):
     """Resolves the Train Model action with tile modifiers."""
     player = db.get(Player, player_id)
@@ -281,7 +403,7 @@ def execute_train_model(db: Session, player_id: int, worker_count: int = 1):
 
     update_player_income(db, player)
     check_reputation_tiles(db, player_id)
-    db.commit()
+    db.flush()
     return {
         "action": "model_trained",
         "new_version": player.model_version,
@@ -290,6 +412,9 @@ def execute_train_model(db: Session, player_id: int, worker_count: int = 1):
     }
 
 
+@timed_command
+@traced
+@logged_command
 def execute_marketing(db: Session, player_id: int):
     """Resolves the Marketing action."""
     player = db.get(Player, player_id)
@@ -300,25 +425,22 @@ def execute_marketing(db: Session, player_id: int):
 
     update_player_income(db, player)
     check_reputation_tiles(db, player_id)
-    db.commit()
+    db.flush()
     return {"action": "marketing_resolved", "new_reputation": player.reputation}
 
 
+@timed_command
+@traced
+@logged_command
 def execute_scale_presence(db: Session, player_id: int, target_region: int):
     """Resolves the Scale Presence action."""
     player = db.get(Player, player_id)
-    existing = (
-        db.query(Presence)
-        .filter_by(player_id=player_id, region_id=target_region)
-        .first()
-    )
-    if existing:
+    if not WORLD.is_region(target_region):
+        return {"error": "Unknown region."}
+    presence, frontier = presence_masks(db, player)
+    if presence >> target_region & 1:
         return {"error": "Already present in this region."}
-
-    current_region_ids = [
-        p.region_id for p in db.query(Presence).filter_by(player_id=player_id).all()
-    ]
-    if not any(target_region in WORLD_MAP.get(r_id, []) for r_id in current_region_ids):
+    if not frontier >> target_region & 1:
         return {"error": "Region not adjacent."}
 
     db.add(Presence(player_id=player_id, region_id=target_region))
@@ -334,10 +456,13 @@ def execute_scale_presence(db: Session, player_id: int, target_region: int):
         player.subsidy_tokens += 1
         update_player_income(db, player)
 
-    db.commit()
+    db.flush()
     return {"action": "presence_scaled", "new_region": target_region}
 
 
+@timed_command
+@traced
+@logged_command
 def execute_increase_net_worth(db: Session, player_id: int):
     player = db.get(Player, player_id)
     game = db.get(Game, player.game_id)
@@ -376,7 +501,7 @@ def execute_increase_net_worth(db: Session, player_id: int):
     # 3. State cleanup
     update_player_income(db, player)
     check_reputation_tiles(db, player_id)
-    db.commit()
+    db.flush()
 
     return {
         "action": "net_worth_increased",
@@ -386,6 +511,9 @@ def execute_increase_net_worth(db: Session, player_id: int):
     }
 
 
+@timed_command
+@traced
+@logged_command
 def execute_recruit_worker(db: Session, player_id: int, target_action: str):
     """Resolves the Recruit action."""
     player = db.get(Player, player_id)
@@ -410,10 +538,13 @@ def execute_recruit_worker(db: Session, player_id: int, target_action: str):
             action_type=target_action,
         )
     )
-    db.commit()
+    db.flush()
     return {"action": "worker_recruited", "new_total": player.total_workers}
 
 
+@timed_command
+@traced
+@logged_command
 def execute_raise_funds_sequence(db: Session, player_id: int, chunks: list[int]):
     """Resolves Raise Funds with Automated Finance modifiers."""
     player = db.get(Player, player_id)
@@ -441,7 +572,7 @@ def execute_raise_funds_sequence(db: Session, player_id: int, chunks: list[int])
         player.corporate_funds = drawn
         summary.append({"workers": worker_count, "siphoned": siphoned, "drawn": drawn})
 
-    db.commit()
+    db.flush()
     return {"action": "raise_funds_resolved", "sequence": summary}
 
 
@@ -450,23 +581,29 @@ def execute_raise_funds_sequence(db: Session, player_id: int, chunks: list[int])
 # ==========================================
 
 
+@timed_command
+@traced
+@logged_command
 def draw_card(db: Session, player_id: int, deck_type: ZoneType):
-    """Low-level draw logic."""
+    """Low-level draw logic. Pops the top card, reshuffling the discard if empty."""
     player = db.get(Player, player_id)
-    card = (
-        db.query(Component)
-        .filter(Component.zone == deck_type.value, Component.game_id == player.game_id)
-        .first()
-    )
-    if not card:
+    hand_zone = f"hand_p{player_id}"
+    values = {"zone": hand_zone, "owner_id": player_id, "is_face_up": False}
+
+    card_id = pop_top_card(db, player.game_id, deck_type.value, values)
+    if card_id is None:
+        game = db.get(Game, player.game_id)
+        if reshuffle_discard(db, game, deck_type.value):
+            card_id = pop_top_card(db, player.game_id, deck_type.value, values)
+    if card_id is None:
         return {"error": f"No cards left in {deck_type.value}"}
 
-    card.zone = f"hand_p{player_id}"
-    card.owner_id = player_id
-    card.is_face_up = False
-    return {"action": "card_drawn", "new_zone": card.zone, "component_id": card.id}
+    return {"action": "card_drawn", "new_zone": hand_zone, "component_id": card_id}
 
 
+@timed_command
+@traced
+@logged_command
 def execute_round_start_draw(db: Session, player_id: int, bonus_deck: ZoneType = None):
     """Batch draw at round start with choice-based bonus."""
     mods = get_player_modifiers(db, player_id)
@@ -484,7 +621,7 @@ def execute_round_start_draw(db: Session, player_id: int, bonus_deck: ZoneType =
             return {"error": "Bonus draw choice required."}
         results.append(draw_card(db, player_id, bonus_deck))
 
-    db.commit()
+    db.flush()
     hand_count = (
         db.query(Component)
         .filter(Component.owner_id == player_id, Component.zone == f"hand_p{player_id}")
@@ -500,6 +637,9 @@ def execute_round_start_draw(db: Session, player_id: int, bonus_deck: ZoneType =
     return {"status": "success", "results": results}
 
 
+@timed_command
+@traced
+@logged_command
 def discard_card(db: Session, player_id: int, card_id: int):
     """Discards a card to its sub-type pile."""
     card = db.get(Component, card_id)
@@ -507,21 +647,27 @@ def discard_card(db: Session, player_id: int, card_id: int):
         return {"error": "Invalid card."}
     card.zone = f"{card.sub_type}_discard"
     card.owner_id = None
-    db.commit()
+    db.flush()
     return {"action": "card_discarded", "card_id": card_id}
 
 
+@timed_command
+@traced
+@logged_command
 def move_piece(db: Session, component_id: int, new_x: float, new_y: float):
     """Updates physical board coordinates."""
     piece = db.query(Component).get(component_id)
     if piece:
         piece.pos_x, piece.pos_y = new_x, new_y
         piece.z_index += 1
-        db.commit()
+        db.flush()
         return {"success": True}
     return {"error": "Piece not found"}
 
 
+@timed_command
+@traced
+@logged_command
 def play_card(db: Session, player_id: int, card_id: int, target_slot: int = None):
     """Moves a card to active slot or discard."""
     card = db.get(Component, card_id)
@@ -529,8 +675,12 @@ def play_card(db: Session, player_id: int, card_id: int, target_slot: int = None
         return {"error": "Not owner."}
 
     if card.card_details.is_effect:
-        if not target_slot or not (1 <= target_slot <= 3):
+        if not target_slot or target_slot < 1:
             return {"error": "Invalid slot."}
+        if target_slot > 3:
+            # Extra slots come from tiles; only look them up when asked for one
+            if target_slot > get_player_modifiers(db, player_id)["effect_slots"]:
+                return {"error": "Invalid slot."}
         target_zone = f"active_effect_card_slot_{target_slot}_p{player_id}"
         existing = (
             db.query(Component)
@@ -543,7 +693,7 @@ def play_card(db: Session, player_id: int, card_id: int, target_slot: int = None
     else:
         card.zone, card.owner_id = f"{card.sub_type}_discard", None
 
-    db.commit()
+    db.flush()
     return {"action": "card_played", "new_zone": card.zone}
 
 
@@ -567,6 +717,9 @@ def get_sorted_players(
     ]
 
 
+@timed_command
+@traced
+@logged_command
 def place_worker(db: Session, player_id: int, worker_number: int, action_type: str):
     """
     Validates and places (or updates) a worker on a specific action slot.
@@ -599,7 +752,7 @@ def place_worker(db: Session, player_id: int, worker_number: int, action_type: s
         )
         db.add(placement)
 
-    db.commit()
+    db.flush()
     return {
         "action": "worker_placed",
         "worker_number": worker_number,
@@ -607,6 +760,9 @@ def place_worker(db: Session, player_id: int, worker_number: int, action_type: s
     }
 
 
+@timed_command
+@traced
+@logged_command
 def execute_action(
     db: Session, player_id: int, action_type: str, worker_count: int = 1
 ):
@@ -624,44 +780,121 @@ def execute_action(
     if action_type == "increase_net_worth":
         return execute_increase_net_worth(db, player_id)
     if action_type == "scale_presence":
-        return execute_scale_presence(db, player_id, 1)  # Placeholder region
+        # Placements don't carry a region yet; take the first one in reach
+        options = expansion_options(db, player_id)
+        if not options:
+            return {"error": "No region to expand into."}
+        return execute_scale_presence(db, player_id, options[0])
     return {"error": "Action unrecognized"}
 
 
-def resolve_entire_round(db: Session, game_id: int):
-    """Processes all quarterly strategies numerically."""
-    game = db.get(Game, game_id)
-    players = db.query(Player).filter_by(game_id=game_id).all()
-    for player in get_sorted_players(db, players, game.p1_token_index):
-        resolved = set()
-        while True:
-            p = (
-                db.query(WorkerPlacement)
+def apply_round_upkeep(db: Session, players: list[Player]):
+    """
+    Applies the tile effects that trigger once per round: power changes
+    (Power Drain) and forced discards, lowest card id first so a replay
+    discards the same cards (Information Leak).
+    """
+    for player in players:
+        mods = get_player_modifiers(db, player.id)
+        if mods["round_power_offset"]:
+            player.power = max(0, min(40, player.power + mods["round_power_offset"]))
+            update_player_income(db, player)
+        if mods["round_discards"] > 0:
+            cards = (
+                db.query(Component)
                 .filter(
-                    WorkerPlacement.player_id == player.id,
-                    WorkerPlacement.worker_number.notin_(resolved),
+                    Component.owner_id == player.id,
+                    Component.zone == f"hand_p{player.id}",
                 )
-                .order_by(WorkerPlacement.worker_number.asc())
-                .first()
-            )
-            if not p:
-                break
-
-            group = (
-                db.query(WorkerPlacement)
-                .filter_by(player_id=player.id, worker_number=p.worker_number)
+                .order_by(Component.id)
+                .limit(mods["round_discards"])
                 .all()
             )
-            execute_action(db, player.id, p.action_type, len(group))
-            for w in group:
-                resolved.add(w.worker_number)
-
-    game.p1_token_index = (game.p1_token_index + 1) % len(players)
-    db.query(WorkerPlacement).filter_by(game_id=game_id).delete()
-    leaderboard = calculate_game_leaderboard(db, game_id)
-    db.commit()
+            for card in cards:
+                card.zone, card.owner_id = f"{card.sub_type}_discard", None
+
+
+_PLACEMENT_COLUMNS = (
+    WorkerPlacement.id,
+    WorkerPlacement.player_id,
+    WorkerPlacement.worker_number,
+    WorkerPlacement.action_type,
+)
+
+
+def group_placements(placements) -> dict:
+    """
+    Groups placement rows as {player_id: {worker_number: [rows]}}.
+    Rows are plain column tuples, so later commits can't expire them.
+    """
+    grouped = {}
+    for p in sorted(placements, key=lambda x: (x.player_id, x.worker_number, x.id)):
+        grouped.setdefault(p.player_id, {}).setdefault(p.worker_number, []).append(p)
+    return grouped
+
+
+@timed_command
+@traced
+@logged_command
+def resolve_entire_round(db: Session, game_id: int):
+    """
+    Processes all quarterly strategies numerically, as one transaction: the
+    actions only flush, and the round commits once at the end. If anything
+    raises, the whole round is rolled back.
+    """
+    started = time.perf_counter()
+    queries_before = queries_issued()
+
+    try:
+        game = db.get(Game, game_id)
+        players = db.query(Player).filter_by(game_id=game_id).all()
+        load_game_modifiers(db, game_id)
+        grouped = group_placements(
+            db.execute(
+                select(*_PLACEMENT_COLUMNS).where(WorkerPlacement.game_id == game_id)
+            ).all()
+        )
+
+        for player in get_sorted_players(db, players, game.p1_token_index):
+            groups = grouped.get(player.id, {})
+            resolved = set()
+            while groups:
+                worker_number = min(groups)
+                group = groups.pop(worker_number)
+                result = execute_action(db, player.id, group[0].action_type, len(group))
+                resolved.add(worker_number)
+
+                # Recruiting places the new worker immediately; pick it up this round
+                if result.get("action") == "worker_recruited":
+                    fresh = db.execute(
+                        select(*_PLACEMENT_COLUMNS).where(
+                            WorkerPlacement.game_id == game_id,
+                            WorkerPlacement.player_id == player.id,
+                            WorkerPlacement.worker_number.notin_(resolved),
+                        )
+                    ).all()
+                    groups = group_placements(fresh).get(player.id, {})
+
+        if REPUTATION_TILES_AT_ROUND_END:
+            recompute_reputation_tiles(db, game_id)
+        apply_round_upkeep(db, players)
+        game.p1_token_index = (game.p1_token_index + 1) % len(players)
+        db.query(WorkerPlacement).filter_by(game_id=game_id).delete()
+        pending_delta(db, game_id).clear_placements()
+        leaderboard = calculate_game_leaderboard(db, game_id)
+        new_p1_index = game.p1_token_index
+        if db.info.get("replaying"):
+            db.flush()  # A recovery commits once, after its whole tail
+        else:
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
     return {
         "action": "round_resolved",
-        "new_p1_index": game.p1_token_index,
+        "new_p1_index": new_p1_index,
         "leaderboard": leaderboard,
+        "query_count": queries_issued() - queries_before,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
     }
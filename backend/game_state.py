@@ -0,0 +1,170 @@
+"""
+Read models for the game state endpoints.
+
+A game's rows are deliberately not kept in a separate in-memory aggregate
+or cached between requests. The engine rules run on the session's ORM rows,
+which already write back only changed columns in one flush per command
+(see database.finish_command). Rows kept resident across requests would be
+shared between DB pool threads, would go stale under other workers' writes,
+and would have to be invalidated on every event-log replay and restore.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.models import (
+    CardDetails,
+    Component,
+    Player,
+    Presence,
+    RegionState,
+    ReputationTile,
+    WorkerPlacement,
+)
+
+
+def read_state_view(db: Session, game_id: int) -> dict:
+    """
+    Builds the /game/{game_id}/state payload, minus the games-row fields,
+    from plain column selects: players LEFT JOIN placements, the cards
+    players hold, regions, presence and tiles. The statement count does not
+    grow with the number of players.
+    """
+    rows = db.execute(
+        select(
+            Player.id,
+            Player.user_name,
+            Player.power,
+            Player.income,
+            Player.net_worth_level,
+            Player.total_workers,
+            Player.corporate_funds,
+            Player.personal_funds,
+            Player.reputation,
+            Player.compute_level,
+            Player.model_version,
+            Player.presence_count,
+            Player.subsidy_tokens,
+            Player.vp,
+            WorkerPlacement.worker_number,
+            WorkerPlacement.action_type,
+        )
+        .outerjoin(WorkerPlacement, WorkerPlacement.player_id == Player.id)
+        .where(Player.game_id == game_id)
+        .order_by(Player.id, WorkerPlacement.worker_number)
+    )
+
+    players, placements = {}, []
+    for row in rows:
+        player = players.get(row.id)
+        if player is None:
+            player = players[row.id] = {
+                "id": row.id,
+                "name": row.user_name,
+                "power": row.power,
+                "income": row.income,
+                "net_worth": row.net_worth_level,
+                "total_worker_count": row.total_workers,
+                "corporate_funds": row.corporate_funds,
+                "personal_funds": row.personal_funds,
+                "reputation": row.reputation,
+                "compute_level": row.compute_level,
+                "model_version": row.model_version,
+                "presence_count": row.presence_count,
+                "subsidy_tokens": row.subsidy_tokens,
+                "vp": row.vp,
+                "placed_worker_numbers": [],
+                "hand": [],
+                "active_effects": {},
+            }
+        if row.worker_number is not None:
+            player["placed_worker_numbers"].append(row.worker_number)
+            placements.append(
+                {
+                    "player_id": row.id,
+                    "action_type": row.action_type,
+                    "worker_number": row.worker_number,
+                }
+            )
+
+    # Cards held by players: hand_p{id} or active_effect_card_slot_{n}_p{id}
+    cards = db.execute(
+        select(
+            Component.id,
+            Component.name,
+            Component.zone,
+            Component.owner_id,
+            CardDetails.deck,
+            CardDetails.cost,
+            CardDetails.is_effect,
+        )
+        .outerjoin(CardDetails, CardDetails.id == Component.card_details_id)
+        .where(Component.game_id == game_id, Component.owner_id.is_not(None))
+        .order_by(Component.id)
+    )
+    for card in cards:
+        player = players.get(card.owner_id)
+        if player is None:
+            continue
+        view = {
+            "id": card.id,
+            "name": card.name,
+            "deck": card.deck,
+            "cost": card.cost,
+            "is_effect": bool(card.is_effect),
+        }
+        if card.zone == f"hand_p{card.owner_id}":
+            player["hand"].append(view)
+        elif card.zone.startswith("active_effect_card_slot_"):
+            slot = int(card.zone.split("_")[4])
+            player["active_effects"][slot] = view
+
+    regions = {
+        row.region_id: {
+            "region_id": row.region_id,
+            "subsidy_tokens_remaining": row.subsidy_tokens_remaining,
+            "presence": [],
+        }
+        for row in db.execute(
+            select(RegionState.region_id, RegionState.subsidy_tokens_remaining)
+            .where(RegionState.game_id == game_id)
+            .order_by(RegionState.region_id)
+        )
+    }
+    for row in db.execute(
+        select(Presence.player_id, Presence.region_id)
+        .join(Player, Player.id == Presence.player_id)
+        .where(Player.game_id == game_id)
+        .order_by(Presence.region_id, Presence.player_id)
+    ):
+        if row.region_id in regions:
+            regions[row.region_id]["presence"].append(row.player_id)
+
+    tiles = [
+        {
+            "id": row.id,
+            "level": row.level,
+            "name": row.name,
+            "effect_code": row.effect_code,
+            "owner_id": row.owner_id,
+        }
+        for row in db.execute(
+            select(
+                ReputationTile.id,
+                ReputationTile.level,
+                ReputationTile.name,
+                ReputationTile.effect_code,
+                ReputationTile.owner_id,
+            )
+            .where(ReputationTile.game_id == game_id)
+            .order_by(ReputationTile.level, ReputationTile.id)
+        )
+    ]
+
+    return {
+        "game_id": game_id,
+        "players": list(players.values()),
+        "placements": placements,
+        "regions": list(regions.values()),
+        "tiles": tiles,
+    }
@@ -0,0 +1,164 @@
+from sqlalchemy import delete, event, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from backend.models import LeaderboardEntry, Player
+
+# Player columns that feed into VP. A change to any of them (or adding or
+# removing a player) re-materializes that game's leaderboard rows.
+VP_FIELDS = ("power", "model_version", "presence_count", "vp", "personal_funds")
+
+
+def compute_standings(players) -> list[dict]:
+    """
+    Calculates total VP for the given players of one game, including
+    competitive ranking bonuses (Personal Funds). Players may be ORM rows or
+    any objects with the same attributes.
+    """
+    player_count = len(players)
+
+    # 1. Rank players by Personal Funds for the cash bonus
+    # Sort descending: highest funds first
+    sorted_by_funds = sorted(players, key=lambda p: p.personal_funds, reverse=True)
+
+    fund_bonuses = {}
+    if player_count == 2:
+        fund_bonuses[sorted_by_funds[0].id] = 3
+    elif player_count == 3:
+        fund_bonuses[sorted_by_funds[0].id] = 3
+        fund_bonuses[sorted_by_funds[1].id] = 1
+    elif player_count >= 4:
+        fund_bonuses[sorted_by_funds[0].id] = 3
+        fund_bonuses[sorted_by_funds[1].id] = 2
+        fund_bonuses[sorted_by_funds[2].id] = 1
+
+    standings = []
+    for player in players:
+        breakdown = {
+            # Base VP from race bonuses (Millionaire/Billionaire first-to-finish)
+            "race_bonuses": player.vp,
+            # 1VP for each 5 Power
+            "power_vp": player.power // 5,
+            # 1VP for each Model Version
+            "model_vp": player.model_version,
+            # 1VP per Region with Presence
+            "presence_vp": player.presence_count,
+            # Personal Funds Ranking Bonus
+            "funds_bonus": fund_bonuses.get(player.id, 0),
+        }
+        standings.append(
+            {
+                "player_id": player.id,
+                "user_name": player.user_name,
+                "total_vp": sum(breakdown.values()),
+                "breakdown": breakdown,
+            }
+        )
+    return standings
+
+
+def _player_rows(db, game_id: int) -> list:
+    return db.execute(
+        select(
+            Player.id,
+            Player.user_name,
+            Player.power,
+            Player.model_version,
+            Player.presence_count,
+            Player.vp,
+            Player.personal_funds,
+        )
+        .where(Player.game_id == game_id)
+        .order_by(Player.id)
+    ).all()
+
+
+def refresh_leaderboard(db, game_id: int):
+    """Recomputes and stores the materialized rows for one game."""
+    players = _player_rows(db, game_id)
+    db.execute(delete(LeaderboardEntry).where(LeaderboardEntry.game_id == game_id))
+    if players:
+        db.execute(
+            insert(LeaderboardEntry),
+            [
+                {
+                    "player_id": s["player_id"],
+                    "game_id": game_id,
+                    "user_name": s["user_name"],
+                    "total_vp": s["total_vp"],
+                    **s["breakdown"],
+                }
+                for s in compute_standings(players)
+            ],
+        )
+
+
+def read_leaderboard(db: Session, game_id: int) -> list[dict]:
+    """
+    Returns the standings for a game, highest VP first, without writing.
+    Normally one select of the stored rows; a game whose rows this
+    transaction has made stale, or which has none yet (created before the
+    table existed), is computed from its players instead.
+    """
+    # Pending player changes must be seen before deciding what to read
+    db.flush()
+    if game_id not in db.info.get("leaderboard_stale", ()):
+        rows = db.execute(
+            select(*LeaderboardEntry.__table__.c)
+            .where(LeaderboardEntry.game_id == game_id)
+            .order_by(LeaderboardEntry.total_vp.desc(), LeaderboardEntry.player_id)
+        ).all()
+        if rows:
+            return [
+                {
+                    "player_id": row.player_id,
+                    "user_name": row.user_name,
+                    "total_vp": row.total_vp,
+                    "breakdown": {
+                        "race_bonuses": row.race_bonuses,
+                        "power_vp": row.power_vp,
+                        "model_vp": row.model_vp,
+                        "presence_vp": row.presence_vp,
+                        "funds_bonus": row.funds_bonus,
+                    },
+                }
+                for row in rows
+            ]
+
+    standings = compute_standings(_player_rows(db, game_id))
+    return sorted(standings, key=lambda s: (-s["total_vp"], s["player_id"]))
+
+
+# ==========================================
+# MAINTENANCE ON COMMIT
+# ==========================================
+
+# A flush only notes which games' rows went stale; before_commit rebuilds
+# each of them once, however many flushes the transaction made.
+
+
+def _vp_changed(player: Player) -> bool:
+    attrs = inspect(player).attrs
+    return any(attrs[name].history.has_changes() for name in VP_FIELDS)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_changed_games(session, flush_context):
+    stale = session.info.setdefault("leaderboard_stale", set())
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, Player):
+            stale.add(obj.game_id)
+    for obj in session.dirty:
+        if isinstance(obj, Player) and _vp_changed(obj):
+            stale.add(obj.game_id)
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_stale_games(session):
+    session.flush()
+    for game_id in sorted(session.info.pop("leaderboard_stale", ())):
+        refresh_leaderboard(session, game_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_stale_games(session):
+    session.info.pop("leaderboard_stale", None)
@@ -1,34 +1,188 @@
-from fastapi import FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import (
+    FastAPI,
+    Depends,
+    Header,
+    HTTPException,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from pydantic_core import to_json
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import List, Optional
 
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import FileResponse
+
+from backend.database import (
+    SessionLocal,
+    check_schema,
+    describe_database,
+    finish_command,
+    run_in_session,
+)
+from backend.deltas import pop_committed
+from backend.game_state import read_state_view
+from backend import (
+    game_engine,
+    metrics,
+    models,
+    profiling,
+    scheduler,
+    schemas,
+    tracing,
+)
 
-from backend.database import SessionLocal
-from backend import game_engine, schemas, models
 
+class _Connection:
+    """One websocket plus its outbound queue and the task draining it."""
 
-class ConnectionManager:
-    def __init__(self):
-        # Stores active websocket connections
-        self.active_connections: list[WebSocket] = []
+    __slots__ = ("websocket", "game_id", "queue", "sender", "loop")
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+    def __init__(self, websocket: WebSocket, game_id: int, queue_size: int):
+        self.websocket = websocket
+        self.game_id = game_id
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.loop = asyncio.get_running_loop()
+        self.sender = None
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
 
-    async def broadcast(self, message: dict):
-        """Sends a JSON message to all connected players."""
-        for connection in self.active_connections:
-            await connection.send_json(message)
+class ConnectionManager:
+    """
+    Tracks websockets per game room. Broadcasts are serialized once and
+    queued to each recipient; a per-connection task does the sending, so a
+    slow socket never holds up the others. The rooms are only read and
+    changed on the event loop that serves the sockets.
+    """
+
+    def __init__(self, queue_size: int = 32, laggard_policy: str = "disconnect"):
+        # laggard_policy: what to do when a socket's queue is full.
+        # "drop" skips the message for that socket, "disconnect" closes it.
+        self.queue_size = queue_size
+        self.laggard_policy = laggard_policy
+        self.rooms: dict[int, dict[WebSocket, _Connection]] = {}
+        # The loop the sockets are served on, known once one connects
+        self.loop = None
+
+    @property
+    def active_connections(self) -> list[WebSocket]:
+        return [ws for room in self.rooms.values() for ws in room]
+
+    async def connect(self, websocket: WebSocket, game_id: int):
+        await websocket.accept()
+        self.loop = asyncio.get_running_loop()
+        conn = _Connection(websocket, game_id, self.queue_size)
+        conn.sender = asyncio.create_task(self._send_loop(conn))
+        self.rooms.setdefault(game_id, {})[websocket] = conn
+        metrics.WS_CONNECTIONS.inc(1, "fastapi")
+
+    def disconnect(self, websocket: WebSocket, game_id: int):
+        room = self.rooms.get(game_id, {})
+        conn = room.pop(websocket, None)
+        if not room:
+            self.rooms.pop(game_id, None)
+        if conn:
+            metrics.WS_CONNECTIONS.dec(1, "fastapi")
+            if conn.sender is not asyncio.current_task():
+                conn.sender.cancel()
+
+    async def broadcast(self, message: dict, game_id: int):
+        """Queues a JSON message for every player connected to the game."""
+        self.publish(message, game_id)
+
+    def publish(self, message: dict, game_id: int):
+        """
+        Like broadcast, but callable from any thread (e.g. sync endpoints).
+        Off the loop, the whole fan-out is handed to the loop, so worker
+        threads never iterate rooms while connect/disconnect change them.
+        """
+        text = json.dumps(message)
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return  # Nobody has ever connected
+        if _running_loop() is loop:
+            self._fan_out(text, game_id)
+        else:
+            loop.call_soon_threadsafe(self._fan_out, text, game_id)
+
+    def _fan_out(self, text: str, game_id: int):
+        started = time.perf_counter()
+        current_loop = _running_loop()
+        for conn in list(self.rooms.get(game_id, {}).values()):
+            if conn.loop is current_loop:
+                self._offer(conn, text)
+            else:
+                # Socket is served by another event loop (e.g. in tests)
+                conn.loop.call_soon_threadsafe(self._offer, conn, text)
+        metrics.FANOUT_LATENCY.observe(time.perf_counter() - started, "fastapi")
+
+    def publish_deltas(self, deltas: list[dict]):
+        """Pushes committed state deltas to each game's room, in order."""
+        for delta in deltas:
+            self.publish(delta, delta["game_id"])
+
+    def _offer(self, conn: _Connection, text: str):
+        try:
+            conn.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            if self.laggard_policy == "disconnect":
+                self.disconnect(conn.websocket, conn.game_id)
+                asyncio.create_task(conn.websocket.close(code=1013))
+
+    async def _send_loop(self, conn: _Connection):
+        try:
+            while True:
+                await conn.websocket.send_text(await conn.queue.get())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Dead socket: stop sending to it, without affecting anyone else
+            self.disconnect(conn.websocket, conn.game_id)
+
+
+class FastJSONResponse(Response):
+    """
+    Serializes straight to JSON bytes with pydantic-core. Hot read endpoints
+    return one of these directly, so FastAPI skips the jsonable_encoder walk
+    and the stdlib json pass; their response_model only documents the shape.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return to_json(content)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    print(f"Database settings: {describe_database()}")
+    check_schema()
+    scheduler.resolver_pool.start()
+    yield
+    scheduler.resolver_pool.shutdown()
 
 
 manager = ConnectionManager()
-app = FastAPI(title="Disruptopia API")
+app = FastAPI(title="Disruptopia API", lifespan=lifespan)
+# Lets a flagged request profile sync endpoints on the threadpool
+app.router.route_class = profiling.ProfiledRoute
 
+app.add_middleware(profiling.ProfilingMiddleware)
+app.add_middleware(tracing.TracingMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allows all origins for MVP testing
@@ -40,14 +194,14 @@ app.add_middleware(
 
 @app.websocket("/ws/{game_id}")
 async def websocket_endpoint(websocket: WebSocket, game_id: int):
-    await manager.connect(websocket)
+    await manager.connect(websocket, game_id)
     try:
         while True:
             # We keep the connection alive.
             # Most logic happens via POST, but we can receive chat/pings here.
             data = await websocket.receive_text()
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        manager.disconnect(websocket, game_id)
 
 
 # Dependency to get the DB session
@@ -64,49 +218,99 @@ def read_root():
     return {"status": "Disruptopia Engine Online"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """Latency, query and connection metrics for Prometheus to scrape."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+def _check_admin(x_profile: Optional[str]):
+    if profiling.PROFILE_TOKEN is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not profiling.authorized(x_profile):
+        raise HTTPException(status_code=403, detail="Bad profile token")
+
+
+@app.get("/admin/profiles", tags=["Admin"])
+def list_profiles(x_profile: Optional[str] = Header(None)):
+    """Lists saved request profiles, newest first."""
+    _check_admin(x_profile)
+    return profiling.list_profiles()
+
+
+@app.get("/admin/profiles/{name}", tags=["Admin"])
+def download_profile(name: str, x_profile: Optional[str] = Header(None)):
+    """Downloads one profile, for `python -m pstats` or snakeviz."""
+    _check_admin(x_profile)
+    path = profiling.profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
+
+
 @app.post("/game/{game_id}/resolve", tags=["Game Flow"])
 def resolve_round(game_id: int, db: Session = Depends(get_db)):
     """Triggers the full quarterly strategy resolution."""
     result = game_engine.resolve_entire_round(db, game_id)
+    manager.publish_deltas(pop_committed(db))
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
 
+@app.post("/games/resolve", tags=["Game Flow"])
+def resolve_rounds(req: schemas.BatchResolveRequest):
+    """Resolves many games' rounds in parallel across a process pool."""
+    summary = scheduler.resolve_games(req.game_ids, req.max_workers)
+    for game in summary["results"]:
+        manager.publish_deltas(game.pop("deltas", []))
+    return summary
+
+
+@profiling.profiled
+def _place_worker(db: Session, req: schemas.ActionRequest):
+    """Blocking part of place_worker; runs on the DB thread pool."""
+    # Extract the first worker for the engine (as it handles one-by-one currently)
+    result = finish_command(
+        db,
+        game_engine.place_worker(
+            db,
+            player_id=req.player_id,
+            worker_number=req.worker_ids[0],
+            action_type=req.action_type,
+        ),
+    )
+    if "error" in result:
+        return result, None, []
+    game_id = db.get(models.Player, req.player_id).game_id
+    return result, game_id, pop_committed(db)
+
+
 @app.post("/actions/place-worker")
-async def place_worker(req: schemas.ActionRequest, db: Session = Depends(get_db)):
+async def place_worker(req: schemas.ActionRequest):
     # 1. Validation: Ensure at least one worker was sent
     if not req.worker_ids:
         raise HTTPException(status_code=400, detail="No worker IDs provided.")
 
-    # 2. Extract the first worker for the engine (as it handles one-by-one currently)
-    primary_worker_id = req.worker_ids[0]
-
-    # 3. Call the engine logic
-    result = game_engine.place_worker(
-        db,
-        player_id=req.player_id,
-        worker_number=primary_worker_id,
-        action_type=req.action_type,
-    )
+    # 2. Call the engine logic off the event loop
+    result, game_id, deltas = await run_in_session(_place_worker, req)
 
-    # 4. Handle errors from the engine
+    # 3. Handle errors from the engine
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
 
-    # 5. Broadcast the update to all connected players (refreshing the frontend)
-    # Note: We need a game_id here. If ActionRequest doesn't have it,
-    # we can fetch it from the player object.
-    player = db.get(models.Player, req.player_id)
+    # 4. Broadcast the update to all connected players (refreshing the frontend)
     await manager.broadcast(
         {
             "type": "WORKER_PLACED",
-            "game_id": player.game_id,
+            "game_id": game_id,
             "player_id": req.player_id,
             "worker_ids": req.worker_ids,
             "slot": req.action_type,
-        }
+        },
+        game_id,
     )
+    manager.publish_deltas(deltas)
 
     return result
 
@@ -123,43 +327,50 @@ def play_card(req: schemas.CardPlayRequest, db: Session = Depends(get_db)):
         and "active_effect_card" not in result["new_zone"]
     ):
         effect_result = game_engine.apply_card_effect(db, req.player_id, req.card_id)
-        return {**result, "effect_result": effect_result}
+        result = {**result, "effect_result": effect_result}
 
+    # The card stays played even if its effect couldn't resolve
+    finish_command(db, result)
+    manager.publish_deltas(pop_committed(db))
     return result
 
 
-@app.get("/game/{game_id}/leaderboard", response_model=List[Dict])
+@app.get(
+    "/game/{game_id}/leaderboard",
+    response_model=List[schemas.LeaderboardRow],
+    response_class=FastJSONResponse,
+)
 def get_leaderboard(game_id: int, db: Session = Depends(get_db)):
     """Returns the live VP standings."""
-    return game_engine.calculate_game_leaderboard(db, game_id)
-
-
-@app.get("/game/{game_id}/state")
-def get_game_state(game_id: int, db: Session = Depends(get_db)):
-    players = db.query(models.Player).filter(models.Player.game_id == game_id).all()
-
-    return {
-        "game_id": game_id,
-        "players": [
-            {
-                "id": p.id,
-                "name": p.user_name,
-                "power": p.power,
-                "income": p.income,
-                "net_worth": p.net_worth_level,
-                "total_worker_count": p.total_workers,  # This is the integer from the Player table
-                "placed_worker_numbers": [w.worker_number for w in p.worker_placements],
-            }
-            for p in players
-        ],
-        "placements": [
-            {
-                "player_id": pl.player_id,
-                "action_type": pl.action_type,
-                "worker_number": pl.worker_number,
-            }
-            for pl in db.query(models.WorkerPlacement)
-            .filter(models.WorkerPlacement.game_id == game_id)
-            .all()
-        ],
-    }
+    return FastJSONResponse(game_engine.calculate_game_leaderboard(db, game_id))
+
+
+@app.get(
+    "/game/{game_id}/state",
+    response_model=schemas.GameStateResponse,
+    response_class=FastJSONResponse,
+)
+def get_game_state(
+    game_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    # The version only moves when a commit changes the game, so it makes a
+    # cheap ETag: unchanged games are answered without reading any players.
+    game = db.execute(
+        select(
+            models.Game.state_version,
+            models.Game.game_phase,
+            models.Game.p1_token_index,
+        ).where(models.Game.id == game_id)
+    ).first()
+    if game is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    version = game.state_version or 0
+    etag = f'"{game_id}-{version}"'
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    state = read_state_view(db, game_id)
+    state.update(version=version, phase=game.game_phase, p1_index=game.p1_token_index)
+    return FastJSONResponse(state, headers={"ETag": etag, "Cache-Control": "no-cache"})
@@ -0,0 +1,255 @@
+"""
+In-process metrics, exposed in the Prometheus text format at GET /metrics.
+
+SQL statements and commits are measured through SQLAlchemy events, engine
+commands through @timed_command, and MetricsMiddleware measures each HTTP
+request. Recording is a lock, a bisect and two adds, so it stays on in
+production.
+"""
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from backend.database import counting_queries
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds, in seconds unless noted
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.25)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)  # statements
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = (f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for values, total in sorted(self._values.items()):
+            lines.append(f"{self.name}{_label_text(self.labels, values)} {total}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, *label_values):
+        self.inc(-amount, *label_values)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        # {label values: [count per bucket (+Inf last), sum]}
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, amount: float, *label_values):
+        index = bisect_left(self.buckets, amount)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][index] += 1
+            series[1] += amount
+
+    def count(self, *label_values) -> int:
+        series = self._series.get(label_values)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        names = self.labels + ("le",)
+        for values, (counts, total) in sorted(self._series.items()):
+            running = 0
+            for bound, n in zip(self.buckets + ("+Inf",), counts):
+                running += n
+                labels = _label_text(names, values + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {running}")
+            labels = _label_text(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {running}")
+        return lines
+
+
+REGISTRY: list[_Metric] = []
+
+
+def render() -> str:
+    """Every metric, in the Prometheus text exposition format."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# ==========================================
+# 1. METRICS
+# ==========================================
+
+HTTP_LATENCY = Histogram(
+    "disruptopia_http_request_duration_seconds",
+    "HTTP request latency by route.",
+    ("method", "route", "status"),
+)
+HTTP_QUERIES = Histogram(
+    "disruptopia_http_request_queries",
+    "SQL statements issued per HTTP request.",
+    ("route",),
+    buckets=COUNT_BUCKETS,
+)
+ENGINE_LATENCY = Histogram(
+    "disruptopia_engine_command_duration_seconds",
+    "Latency of engine commands, including nested ones.",
+    ("command",),
+)
+DB_QUERY_LATENCY = Histogram(
+    "disruptopia_db_query_duration_seconds",
+    "Time spent in the database driver per statement (its count is the total).",
+    buckets=QUERY_BUCKETS,
+)
+DB_COMMITS = Counter("disruptopia_db_commits_total", "Session commits.")
+DB_ROLLBACKS = Counter("disruptopia_db_rollbacks_total", "Session rollbacks.")
+WS_CONNECTIONS = Gauge(
+    "disruptopia_ws_connections", "Open websocket connections.", ("server",)
+)
+WS_HANDLER_LATENCY = Histogram(
+    "disruptopia_ws_handler_duration_seconds",
+    "Latency of websocket event handlers.",
+    ("event",),
+)
+FANOUT_LATENCY = Histogram(
+    "disruptopia_broadcast_fanout_seconds",
+    "Time to hand one broadcast to every recipient.",
+    ("server",),
+)
+
+
+# ==========================================
+# 2. HOOKS
+# ==========================================
+
+# Statement counts come from database.counting_queries; these hooks only time
+# them. The start time lives on the statement's own execution context, so a
+# statement that raises leaves nothing behind.
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_query(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "metrics_started", None)
+    if started is not None:
+        DB_QUERY_LATENCY.observe(time.perf_counter() - started)
+
+
+@event.listens_for(Session, "after_commit")
+def _count_commit(session):
+    DB_COMMITS.inc()
+
+
+@event.listens_for(Session, "after_rollback")
+def _count_rollback(session):
+    DB_ROLLBACKS.inc()
+
+
+def timed_handler(name: str, hist: Histogram = WS_HANDLER_LATENCY):
+    """Decorator recording a handler's latency under the given label."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.observe(time.perf_counter() - started, name)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_command(fn):
+    """timed_handler for engine commands, labelled with the function name."""
+    return timed_handler(fn.__name__, ENGINE_LATENCY)(fn)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request and counting its statements.
+    Requests are labelled by route template, so ids don't explode the
+    number of series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        with counting_queries() as queries:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                elapsed = time.perf_counter() - started
+                route = getattr(scope.get("route"), "path", "unmatched")
+                HTTP_LATENCY.observe(elapsed, scope["method"], route, str(status[0]))
+                HTTP_QUERIES.observe(queries[0], route)
@@ -1,5 +1,14 @@
 from typing import List, Optional
-from sqlalchemy import ForeignKey, String, Integer, Boolean, Float
+from sqlalchemy import (
+    ForeignKey,
+    String,
+    Integer,
+    Boolean,
+    Float,
+    Index,
+    LargeBinary,
+    Text,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -17,6 +26,15 @@ class Game(Base):
     millionaire_count: Mapped[int] = mapped_column(Integer, default=0)
     billionaire_count: Mapped[int] = mapped_column(Integer, default=0)
 
+    # --- Deck Shuffling (see backend/decks.py) ---
+    rng_seed: Mapped[int] = mapped_column(Integer, default=0)
+    shuffle_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Bumped on every commit that changes the game (see backend/deltas.py)
+    state_version: Mapped[int] = mapped_column(Integer, default=0)
+    # Last event log number handed out (see backend/event_log.py)
+    last_event_seq: Mapped[int] = mapped_column(Integer, default=0)
+
     # Relationships
     players: Mapped[List["Player"]] = relationship(back_populates="game")
     components: Mapped[List["Component"]] = relationship(back_populates="game")
@@ -26,7 +44,7 @@ class Player(Base):
     __tablename__ = "players"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    game_id: Mapped[int] = mapped_column(ForeignKey("games.id"))
+    game_id: Mapped[int] = mapped_column(ForeignKey("games.id"), index=True)
     user_name: Mapped[str] = mapped_column(String(50))
     player_order: Mapped[int] = mapped_column(Integer)  # 0 to 4
     is_online: Mapped[bool] = mapped_column(Boolean, default=True)
@@ -90,6 +108,11 @@ class Component(Base):
     """
 
     __tablename__ = "components"
+    __table_args__ = (
+        # Also serves (game_id, zone) lookups as its leading columns
+        Index("ix_components_deck_order", "game_id", "zone", "position"),
+        Index("ix_components_owner_zone", "owner_id", "zone"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     game_id: Mapped[int] = mapped_column(ForeignKey("games.id"))
@@ -108,6 +131,8 @@ class Component(Base):
     # State & Location
     # 'zone' defines where it is (e.g., 'BOARD', 'DECK', 'HAND_PLAYER_1')
     zone: Mapped[str] = mapped_column(String(30), default="DECK")
+    # Order within a deck; the lowest position is the top card
+    position: Mapped[Optional[int]] = mapped_column(Integer)
 
     # Coordinates for when it is on the BOARD (using Metric/Float for precision)
     pos_x: Mapped[float] = mapped_column(Float, default=0.0)
@@ -122,6 +147,16 @@ class Component(Base):
 
 class WorkerPlacement(Base):
     __tablename__ = "worker_placements"
+    __table_args__ = (
+        # A worker can only stand on one action slot at a time
+        Index(
+            "uq_placement_worker",
+            "game_id",
+            "player_id",
+            "worker_number",
+            unique=True,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     game_id: Mapped[int] = mapped_column(ForeignKey("games.id"))
@@ -136,6 +171,9 @@ class WorkerPlacement(Base):
 
 class Presence(Base):
     __tablename__ = "presence"
+    __table_args__ = (
+        Index("uq_presence_region", "player_id", "region_id", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     player_id: Mapped[int] = mapped_column(ForeignKey("players.id"))
@@ -144,6 +182,7 @@ class Presence(Base):
 
 class RegionState(Base):
     __tablename__ = "region_states"
+    __table_args__ = (Index("uq_region_state", "game_id", "region_id", unique=True),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     game_id: Mapped[int] = mapped_column(ForeignKey("games.id"))
@@ -153,6 +192,10 @@ class RegionState(Base):
 
 class ReputationTile(Base):
     __tablename__ = "reputation_tiles"
+    __table_args__ = (
+        Index("ix_reputation_tiles_owner", "owner_id"),
+        Index("ix_reputation_tiles_level_owner", "game_id", "level", "owner_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     game_id: Mapped[int] = mapped_column(ForeignKey("games.id"))
@@ -164,3 +207,53 @@ class ReputationTile(Base):
     effect_code: Mapped[str] = mapped_column(
         String(50)
     )  # Internal ID for the bonus logic
+
+
+class LeaderboardEntry(Base):
+    """
+    Materialized VP standings, one row per player. Kept up to date on write
+    by backend/leaderboard.py so reading the leaderboard is a single select.
+    """
+
+    __tablename__ = "leaderboard"
+    __table_args__ = (Index("ix_leaderboard_game_total", "game_id", "total_vp"),)
+
+    player_id: Mapped[int] = mapped_column(ForeignKey("players.id"), primary_key=True)
+    game_id: Mapped[int] = mapped_column(ForeignKey("games.id"))
+    user_name: Mapped[str] = mapped_column(String(50))
+    total_vp: Mapped[int] = mapped_column(Integer, default=0)
+
+    # --- Breakdown ---
+    race_bonuses: Mapped[int] = mapped_column(Integer, default=0)
+    power_vp: Mapped[int] = mapped_column(Integer, default=0)
+    model_vp: Mapped[int] = mapped_column(Integer, default=0)
+    presence_vp: Mapped[int] = mapped_column(Integer, default=0)
+    funds_bonus: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class GameEvent(Base):
+    """
+    One engine command applied to a game, in the order it was applied.
+    Append-only; see backend/event_log.py.
+    """
+
+    __tablename__ = "game_events"
+    __table_args__ = (Index("uq_game_event_seq", "game_id", "seq", unique=True),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    game_id: Mapped[int] = mapped_column(ForeignKey("games.id"))
+    seq: Mapped[int] = mapped_column(Integer)  # 1, 2, 3... per game
+    command: Mapped[str] = mapped_column(String(50))  # e.g. "place_worker"
+    args: Mapped[str] = mapped_column(Text)  # JSON keyword arguments
+
+
+class GameSnapshot(Base):
+    """The full state of a game right after event number seq (0 = before any)."""
+
+    __tablename__ = "game_snapshots"
+    __table_args__ = (Index("uq_game_snapshot_seq", "game_id", "seq", unique=True),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    game_id: Mapped[int] = mapped_column(ForeignKey("games.id"))
+    seq: Mapped[int] = mapped_column(Integer)
+    state: Mapped[bytes] = mapped_column(LargeBinary)  # zlib-compressed JSON
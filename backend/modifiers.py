@@ -0,0 +1,73 @@
+"""
+Tile effects compiled into dense delta vectors.
+
+Each modifier in MODIFIER_DEFAULTS gets a fixed position, and each effect in
+TILE_EFFECTS becomes a vector of its deltas in those positions. A player's
+modifiers are the defaults plus the sum of their tiles' vectors, so many
+players (or games) are evaluated in one pass over their owned tiles.
+"""
+
+from backend.config import MODIFIER_DEFAULTS, REPUTATION_TILE_POOL, TILE_EFFECTS
+
+FIELDS = tuple(MODIFIER_DEFAULTS)
+_FLAGS = tuple(isinstance(MODIFIER_DEFAULTS[f], bool) for f in FIELDS)
+BASE = tuple(int(MODIFIER_DEFAULTS[f]) for f in FIELDS)
+ZERO = (0,) * len(FIELDS)
+
+
+def compile_effects(effects: dict) -> dict[str, tuple]:
+    """{effect code: delta vector}; unknown modifier names are an error."""
+    index = {field: i for i, field in enumerate(FIELDS)}
+    vectors = {}
+    for code, deltas in effects.items():
+        unknown = set(deltas) - set(index)
+        if unknown:
+            raise ValueError(f"Effect {code} changes unknown modifiers {unknown}")
+        vector = [0] * len(FIELDS)
+        for field, delta in deltas.items():
+            vector[index[field]] += int(delta)
+        vectors[code] = tuple(vector)
+    return vectors
+
+
+EFFECT_VECTORS = compile_effects(TILE_EFFECTS)
+
+_missing = {
+    tile["effect"]
+    for tiles in REPUTATION_TILE_POOL.values()
+    for tile in tiles
+    if tile["effect"] not in EFFECT_VECTORS
+}
+if _missing:
+    raise ValueError(f"Tile effects without an entry in TILE_EFFECTS: {_missing}")
+
+
+def total(codes) -> tuple:
+    """BASE plus the vectors of the given effect codes (unknown codes add 0)."""
+    sums = list(BASE)
+    for code in codes:
+        vector = EFFECT_VECTORS.get(code, ZERO)
+        for i, delta in enumerate(vector):
+            sums[i] += delta
+    return tuple(sums)
+
+
+def as_dict(vector: tuple) -> dict:
+    """The modifiers dict the engine reads, with flags turned back to bools."""
+    return {
+        field: value > 0 if flag else value
+        for field, flag, value in zip(FIELDS, _FLAGS, vector)
+    }
+
+
+def evaluate(owned) -> dict:
+    """
+    Modifiers for many players at once, from (player_id, effect_code) rows.
+    A row with no effect code (a player without tiles) still gets defaults.
+    """
+    codes = {}
+    for player_id, code in owned:
+        held = codes.setdefault(player_id, [])
+        if code is not None:
+            held.append(code)
+    return {player_id: as_dict(total(held)) for player_id, held in codes.items()}
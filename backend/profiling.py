@@ -0,0 +1,221 @@
+"""
+On-demand profiling of single requests, for use in production.
+
+Set DISRUPTOPIA_PROFILE_TOKEN to allow it. A request then runs under
+cProfile when it carries the token in an X-Profile header or a ?profile=
+query parameter; a Socket.IO event does when its payload has a "profile"
+field set to the token. The merged pstats output goes to the profiles
+directory (DISRUPTOPIA_PROFILE_DIR) and is listed by GET /admin/profiles.
+
+Profiles are taken in whichever threads do the work: sync endpoints on the
+threadpool, and helpers passed to run_in_session when they are decorated
+with @profiled. Each thread gets its own profiler, and they are merged when
+the request ends. Without a token configured, nothing is checked at all;
+with one, unflagged requests cost a header lookup.
+"""
+
+import contextvars
+import functools
+import hmac
+import inspect
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from cProfile import Profile
+from urllib.parse import parse_qs
+
+from fastapi.routing import APIRoute
+
+PROFILE_TOKEN = os.getenv("DISRUPTOPIA_PROFILE_TOKEN") or None
+PROFILE_DIR = os.getenv(
+    "DISRUPTOPIA_PROFILE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"),
+)
+PROFILE_HEADER = "x-profile"
+OUTPUT_HEADER = "x-profile-output"
+
+_active: contextvars.ContextVar = contextvars.ContextVar("profile_run", default=None)
+# Set while this thread is already profiling, so nested calls don't restart it
+_thread = threading.local()
+
+
+class ProfileRun:
+    """The profilers taken for one request, merged into one file at the end."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.profiles: list[Profile] = []
+        self._lock = threading.Lock()
+
+    def filename(self) -> str:
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", self.label).strip("_")
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return f"{stamp}-{slug}-{uuid.uuid4().hex[:8]}.prof"
+
+    def add(self, profile: Profile):
+        with self._lock:
+            self.profiles.append(profile)
+
+    def save(self, name: str) -> str:
+        """Writes the merged stats, unless nothing was profiled."""
+        if not self.profiles:
+            return None
+        stats = pstats.Stats(self.profiles[0])
+        for profile in self.profiles[1:]:
+            stats.add(profile)
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, name)
+        stats.dump_stats(path)
+        return path
+
+
+def configure(token: str = None, directory: str = None):
+    """Changes the token and the output directory (used by tests too)."""
+    global PROFILE_TOKEN, PROFILE_DIR
+    PROFILE_TOKEN = token or None
+    PROFILE_DIR = directory or PROFILE_DIR
+
+
+def authorized(token: str) -> bool:
+    return (
+        PROFILE_TOKEN is not None
+        and token is not None
+        and hmac.compare_digest(token, PROFILE_TOKEN)
+    )
+
+
+# ==========================================
+# 1. PROFILING
+# ==========================================
+
+
+def profiled(fn):
+    """
+    Decorator running fn under this thread's profiler when the current
+    request is being profiled. Otherwise it is a single context lookup.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        run = _active.get()
+        if run is None or getattr(_thread, "profiling", False):
+            return fn(*args, **kwargs)
+        profile = Profile()
+        _thread.profiling = True
+        try:
+            return profile.runcall(fn, *args, **kwargs)
+        finally:
+            _thread.profiling = False
+            run.add(profile)
+
+    return wrapper
+
+
+def profiled_event(name: str):
+    """Decorator profiling a Socket.IO handler whose payload asks for it."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(data, *args, **kwargs):
+            if PROFILE_TOKEN is None or not isinstance(data, dict):
+                return fn(data, *args, **kwargs)
+            if not authorized(data.get("profile")):
+                return fn(data, *args, **kwargs)
+            run = ProfileRun(name)
+            token = _active.set(run)
+            try:
+                return profiled(fn)(data, *args, **kwargs)
+            finally:
+                _active.reset(token)
+                run.save(run.filename())
+
+        return wrapper
+
+    return decorator
+
+
+class ProfiledRoute(APIRoute):
+    """
+    Route class wrapping sync endpoints in @profiled. Async endpoints run on
+    the event loop alongside other requests, so they mark their blocking
+    helpers with @profiled instead.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _requested(scope) -> bool:
+    for key, value in scope["headers"]:
+        if key == PROFILE_HEADER.encode():
+            return authorized(value.decode("latin-1"))
+    if b"profile=" in scope["query_string"]:
+        query = parse_qs(scope["query_string"].decode("latin-1"))
+        return authorized(query.get("profile", [None])[0])
+    return False
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware starting a ProfileRun for flagged HTTP requests. The
+    response names the output file in its X-Profile-Output header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if PROFILE_TOKEN is None or scope["type"] != "http" or not _requested(scope):
+            return await self.app(scope, receive, send)
+
+        run = ProfileRun(scope["method"])
+        name = [None]
+
+        async def send_with_output(message):
+            if message["type"] == "http.response.start":
+                route = getattr(scope.get("route"), "path", scope["path"])
+                run.label = f"{scope['method']} {route}"
+                name[0] = run.filename()
+                headers = list(message.get("headers", []))
+                headers.append((OUTPUT_HEADER.encode(), name[0].encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _active.set(run)
+        try:
+            await self.app(scope, receive, send_with_output)
+        finally:
+            _active.reset(token)
+            run.save(name[0] or run.filename())
+
+
+# ==========================================
+# 2. OUTPUT
+# ==========================================
+
+
+def list_profiles() -> list[dict]:
+    """Saved profiles, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    entries = []
+    for entry in os.scandir(PROFILE_DIR):
+        if entry.is_file() and entry.name.endswith(".prof"):
+            info = entry.stat()
+            entries.append(
+                {"name": entry.name, "bytes": info.st_size, "created": info.st_mtime}
+            )
+    return sorted(entries, key=lambda e: e["created"], reverse=True)
+
+
+def profile_path(name: str) -> str:
+    """The saved profile called name, or None (names can't leave the dir)."""
+    if os.path.basename(name) != name or not name.endswith(".prof"):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,167 @@
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.database import (
+    SQLALCHEMY_DATABASE_URL,
+    SessionLocal,
+    create_db_engine,
+)
+from backend.deltas import pop_committed
+from backend.game_engine import resolve_entire_round
+from backend.models import Player, WorkerPlacement
+
+# Session factory owned by each pool worker (set up by _init_worker).
+_worker_session = None
+
+
+def find_ready_games(db: Session) -> list[int]:
+    """
+    Returns ids of games where every player has placed all of their workers,
+    i.e. games that are waiting on round resolution.
+    """
+    placed = (
+        select(
+            WorkerPlacement.player_id,
+            func.count(func.distinct(WorkerPlacement.worker_number)).label("placed"),
+        )
+        .group_by(WorkerPlacement.player_id)
+        .subquery()
+    )
+    unfinished = func.sum(
+        case((func.coalesce(placed.c.placed, 0) < Player.total_workers, 1), else_=0)
+    )
+    rows = db.execute(
+        select(Player.game_id)
+        .outerjoin(placed, placed.c.player_id == Player.id)
+        .group_by(Player.game_id)
+        .having(unfinished == 0)
+        .order_by(Player.game_id)
+    )
+    return [row.game_id for row in rows]
+
+
+def _init_worker(database_url: str):
+    """Gives each pool process its own engine and session factory."""
+    global _worker_session
+
+    engine = create_db_engine(database_url)
+    _worker_session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _resolve_in_worker(game_id: int) -> dict:
+    """Resolves one game inside a pool process."""
+    started = time.perf_counter()
+    db = _worker_session()
+    try:
+        result = resolve_entire_round(db, game_id)
+    except Exception as e:
+        db.rollback()
+        result = {"error": f"{type(e).__name__}: {e}"}
+    deltas = pop_committed(db)
+    db.close()
+    return {
+        "game_id": game_id,
+        "result": result,
+        # State deltas for the parent to push to the game's websocket room
+        "deltas": deltas,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+class ResolverPool:
+    """
+    A long-lived process pool for round resolution, started once (e.g. in
+    the app lifespan) so requests don't pay process startup. Workers are
+    spawned, not forked: forking the multi-threaded API process can copy
+    locks held by its DB or anyio threads and deadlock the child.
+    """
+
+    def __init__(
+        self, max_workers: int = None, database_url: str = SQLALCHEMY_DATABASE_URL
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.database_url = database_url
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.database_url,),
+                )
+            return self._executor
+
+    def start(self):
+        """Spawns the workers now rather than on the first batch."""
+        self.executor.submit(int).result()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+resolver_pool = ResolverPool()
+
+
+def resolve_games(
+    game_ids: list[int] = None,
+    max_workers: int = None,
+    pool: ResolverPool = None,
+) -> dict:
+    """
+    Resolves a batch of games in parallel, one game per task, with at most
+    max_workers in flight. If game_ids is None, every game whose placements
+    are complete is resolved.
+
+    Games are independent, but every worker writes to the same database.
+    On SQLite the commits still take turns on the single writer lock, so
+    throughput grows with cores only while the rules, not the commits,
+    dominate each round.
+    """
+    pool = pool or resolver_pool
+    if game_ids is None:
+        # A short read of our own, so no caller's transaction is touched
+        db = SessionLocal()
+        try:
+            game_ids = find_ready_games(db)
+        finally:
+            db.close()
+    if not game_ids:
+        return {"results": [], "games_resolved": 0, "games_per_second": 0.0}
+
+    max_workers = min(max_workers or pool.max_workers, pool.max_workers, len(game_ids))
+    started = time.perf_counter()
+    results, pending, queued = {}, {}, iter(game_ids)
+    while True:
+        for game_id in itertools.islice(queued, max_workers - len(pending)):
+            pending[pool.executor.submit(_resolve_in_worker, game_id)] = game_id
+        if not pending:
+            break
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            results[pending.pop(future)] = future.result()
+    elapsed = time.perf_counter() - started
+
+    ordered = [results[game_id] for game_id in game_ids]
+    resolved = [r for r in ordered if "error" not in r["result"]]
+    return {
+        "results": ordered,
+        "games_resolved": len(resolved),
+        "workers": max_workers,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "games_per_second": round(len(resolved) / elapsed, 3) if elapsed else 0.0,
+    }
@@ -28,11 +28,87 @@ class RaiseFundsRequest(BaseModel):
     chunks: List[int]
 
 
+class BatchResolveRequest(BaseModel):
+    """Games to resolve together. Omit game_ids to resolve every ready game."""
+
+    game_ids: Optional[List[int]] = None
+    max_workers: Optional[int] = Field(None, ge=1)
+
+
+class CardView(BaseModel):
+    """A card a player holds, in hand or in an active effect slot."""
+
+    id: int
+    name: str
+    deck: Optional[str] = None
+    cost: Optional[int] = None
+    is_effect: bool = False
+
+
+class PlayerView(BaseModel):
+    id: int
+    name: str
+    power: int
+    income: int
+    net_worth: int
+    total_worker_count: int
+    corporate_funds: int
+    personal_funds: int
+    reputation: int
+    compute_level: int
+    model_version: int
+    presence_count: int
+    subsidy_tokens: int
+    vp: int
+    placed_worker_numbers: List[int]
+    hand: List[CardView]
+    # Slot number (1-3) -> the effect card sitting in it
+    active_effects: Dict[int, CardView]
+
+
+class PlacementView(BaseModel):
+    player_id: int
+    action_type: str
+    worker_number: int
+
+
+class RegionView(BaseModel):
+    region_id: int
+    subsidy_tokens_remaining: int
+    presence: List[int]  # ids of players with presence here
+
+
+class TileView(BaseModel):
+    id: int
+    level: int
+    name: str
+    effect_code: str
+    owner_id: Optional[int] = None
+
+
 class GameStateResponse(BaseModel):
     """The structure of the data sent to the frontend to render the board."""
 
     game_id: int
+    version: int
     phase: str
     p1_index: int
-    leaderboard: List[Dict]
-    # TODO: eventually add components and player hands here
+    players: List[PlayerView]
+    placements: List[PlacementView]
+    regions: List[RegionView]
+    tiles: List[TileView]
+
+
+class VPBreakdown(BaseModel):
+    race_bonuses: int
+    power_vp: int
+    model_vp: int
+    presence_vp: int
+    funds_bonus: int
+
+
+class LeaderboardRow(BaseModel):
+    player_id: int
+    user_name: str
+    total_vp: int
+    breakdown: VPBreakdown
@@ -1,6 +1,13 @@
+import argparse
 import random
+import time
+from functools import lru_cache
 
-from backend.config import REPUTATION_TILE_POOL, CARD_LIBRARY
+from sqlalchemy import Integer, bindparam, case, func, insert, select
+
+from backend.config import REPUTATION_TILE_POOL, CARD_LIBRARY, WORLD_MAP
+from backend.decks import deck_order
+from backend.leaderboard import refresh_leaderboard
 from backend.database import SessionLocal, engine
 from backend.models import (
     Base,
@@ -13,124 +20,278 @@ from backend.models import (
 )
 from backend.enums import ZoneType, ComponentType, CardCategory
 
+# Disruptopia starting stats, shared by every seat
+STARTING_PLAYER = {
+    "power": 3,
+    "income": 3,
+    "corporate_funds": 3,
+    "personal_funds": 0,
+    "total_workers": 3,
+    "reputation": 0,
+    "net_worth_level": 0,
+    "model_version": 0,
+    "compute_level": 1,
+    "presence_count": 1,
+    "subsidy_tokens": 0,
+}
+PLAYER_NAMES = (
+    "Player One",
+    "Player Two",
+    "Player Three",
+    "Player Four",
+    "Player Five",
+)
+
+# Games created per commit by create_games
+CREATE_BATCH_SIZE = 500
+
+
+# ==========================================
+# 1. SHARED DEFINITIONS
+# ==========================================
+
+
+def ensure_card_details(db) -> dict[str, int]:
+    """
+    Inserts the CARD_LIBRARY definitions that aren't stored yet and returns
+    {card name: card_details id}. Definitions are shared by every game.
+    """
+    ids = dict(db.execute(select(CardDetails.name, CardDetails.id)).all())
+    missing = [
+        {
+            "name": data["name"],
+            "is_effect": data["is_effect"],
+            "qty": str(data["qty"]),  # Matching the String(20) column
+            "cost": data["cost"],
+            "deck": data["deck"],
+            "effect_slug": data.get("effect_slug"),
+        }
+        for data in CARD_LIBRARY
+        if data["name"] not in ids
+    ]
+    if missing:
+        db.execute(insert(CardDetails), missing)
+        ids = dict(db.execute(select(CardDetails.name, CardDetails.id)).all())
+    return ids
+
+
+# ==========================================
+# 2. BUILDING A GAME FROM SCRATCH
+# ==========================================
+
 
 def seed_regions(db, game_id, player_count):
     tokens_per_region = 1 if player_count <= 3 else 2
-    for r_id in range(1, 11):
-        region = RegionState(
-            game_id=game_id, region_id=r_id, subsidy_tokens_remaining=tokens_per_region
-        )
-        db.add(region)
-    db.commit()
+    db.execute(
+        insert(RegionState),
+        [
+            {
+                "game_id": game_id,
+                "region_id": r_id,
+                "subsidy_tokens_remaining": tokens_per_region,
+            }
+            for r_id in sorted(WORLD_MAP)
+        ],
+    )
 
 
-def seed_reputation_tiles(db, game_id, player_count):
+def seed_reputation_tiles(db, game_id, player_count, rng=random):
     # Determine how many tiles to pick for levels 1-3
     num_to_pick = 1 if player_count <= 3 else 2
 
     # 0 = Startup/Rep-3, 1 = Level 1, 2 = Level 2, 3 = Level 3
+    picked = []
     for level, tiles in REPUTATION_TILE_POOL.items():
         if level == 0:
             # Special Case: Number of Level 0 tiles ALWAYS matches player count
-            for i in range(player_count):
-                # We cycle through or randomly pick so every player has one available if they hit -3
-                t_data = random.choice(tiles)
-                new_tile = ReputationTile(
-                    game_id=game_id,
-                    level=0,
-                    name=t_data["name"],
-                    effect_code=t_data["effect"],
-                )
-                db.add(new_tile)
+            picked += [(0, rng.choice(tiles)) for _ in range(player_count)]
         else:
             # Standard Case: Shuffle and pick 1 or 2
-            selected_tiles = random.sample(tiles, min(len(tiles), num_to_pick))
-            for t_data in selected_tiles:
-                new_tile = ReputationTile(
-                    game_id=game_id,
-                    level=level,
-                    name=t_data["name"],
-                    effect_code=t_data["effect"],
-                )
-                db.add(new_tile)
+            selected = rng.sample(tiles, min(len(tiles), num_to_pick))
+            picked += [(level, t_data) for t_data in selected]
 
-    db.commit()
+    db.execute(
+        insert(ReputationTile),
+        [
+            {
+                "game_id": game_id,
+                "level": level,
+                "name": t_data["name"],
+                "effect_code": t_data["effect"],
+            }
+            for level, t_data in picked
+        ],
+    )
 
 
-def seed_initial_game():
-    db = SessionLocal()
-    try:
-        # 1. Create Game & Players
-        new_game = Game(game_phase="setup")
-        db.add(new_game)
-        db.commit()
-        db.refresh(new_game)
-
-        p1 = Player(
-            user_name="Player One",
-            player_order=0,
-            game_id=new_game.id,
-            power=3,
-            income=3,
-            corporate_funds=3,
-            personal_funds=0,
-            total_workers=3,
-            reputation=0,
-            net_worth_level=0,
-            model_version=0,
-            compute_level=1,
-            presence_count=1,
-            subsidy_tokens=0,
-        )
-        p2 = Player(
-            user_name="Player Two",
-            player_order=1,
-            game_id=new_game.id,
-            power=3,
-            income=3,
-            corporate_funds=3,
-            personal_funds=0,
-            total_workers=3,
-            reputation=0,
-            net_worth_level=0,
-            model_version=0,
-            compute_level=1,
-            presence_count=1,
-            subsidy_tokens=0,
-        )
-        db.add_all([p1, p2])
-        db.commit()
+def seed_players(db, game_id, player_count):
+    db.execute(
+        insert(Player),
+        [
+            {
+                "user_name": PLAYER_NAMES[order],
+                "player_order": order,
+                "game_id": game_id,
+                **STARTING_PLAYER,
+            }
+            for order in range(player_count)
+        ],
+    )
 
-        player_count = 2
-        seed_regions(db, new_game.id, player_count)
-        seed_reputation_tiles(db, new_game.id, 2)
-
-        # 3. Create Definitions and physical Components
-        for data in CARD_LIBRARY:
-            # Create the shared definition
-            detail = CardDetails(
-                name=data["name"],
-                is_effect=data["is_effect"],
-                qty=str(data["qty"]),  # Matching your String(20) model
-                cost=data["cost"],
-                deck=data["deck"],
-                effect_slug=data.get("effect_slug"),
+
+def create_game(db, player_count: int = 2, rng_seed: int = None) -> int:
+    """
+    Creates a ready-to-play game with one executemany per table and returns
+    its id. The same rng_seed always deals the same tiles and deck order.
+    Flushes only; the caller commits.
+    """
+    if not 2 <= player_count <= len(PLAYER_NAMES):
+        raise ValueError(f"player_count must be 2-{len(PLAYER_NAMES)}")
+    if rng_seed is None:
+        rng_seed = random.randrange(2**31)
+
+    detail_ids = ensure_card_details(db)
+    game = Game(game_phase="setup", rng_seed=rng_seed, shuffle_count=0)
+
+    # Physical cards, grouped by deck so each deck gets its own shuffle
+    decks = {}
+    for data in CARD_LIBRARY:
+        zone = f"{data['deck']}_deck"  # e.g. research_deck
+        for i in range(data["qty"]):
+            decks.setdefault(zone, []).append(
+                {
+                    "name": f"{data['name']}_{i+1}",  # e.g. unethical_data_source_1
+                    "comp_type": ComponentType.CARD.value,
+                    "sub_type": data["deck"],  # Match sub_type to the deck category
+                    "zone": zone,
+                    "card_details_id": detail_ids[data["name"]],
+                }
             )
-            db.add(detail)
-            db.flush()  # Get detail.id without committing yet
-
-            # Create the physical cards (Components)
-            for i in range(data["qty"]):
-                new_card = Component(
-                    name=f"{detail.name}_{i+1}",  # e.g. unethical_data_source_1
-                    comp_type=ComponentType.CARD.value,
-                    sub_type=detail.deck,  # Match sub_type to the deck category
-                    zone=f"{detail.deck}_deck",  # e.g. research_deck
-                    game_id=new_game.id,
-                    card_details_id=detail.id,  # Link the two tables
-                )
-                db.add(new_card)
+    for zone, cards in decks.items():
+        for card, position in zip(cards, deck_order(game, zone, len(cards))):
+            card["position"] = position
+
+    db.add(game)
+    db.flush()
+
+    seed_players(db, game.id, player_count)
+    seed_regions(db, game.id, player_count)
+    seed_reputation_tiles(
+        db, game.id, player_count, rng=random.Random(f"{rng_seed}:tiles")
+    )
+    db.execute(
+        insert(Component),
+        [{**card, "game_id": game.id} for cards in decks.values() for card in cards],
+    )
+    refresh_leaderboard(db, game.id)
+    return game.id
+
 
+# ==========================================
+# 3. CLONING A TEMPLATE GAME
+# ==========================================
+
+
+@lru_cache(maxsize=16)
+def _clone_statements(deck_sizes: tuple) -> tuple:
+    """
+    INSERT ... SELECT statements copying every row of :template_id into
+    :game_id. Deck positions are remapped through :<zone>_<position> params.
+    Built once per deck layout so repeat clones reuse the compiled SQL.
+    """
+    new_position = case(
+        *(
+            (
+                Component.zone == zone,
+                case(
+                    {i: bindparam(f"{zone}_{i}", type_=Integer) for i in range(size)},
+                    value=Component.position,
+                ),
+            )
+            for zone, size in deck_sizes
+        ),
+        else_=Component.position,
+    )
+
+    def clone_rows(model, **overrides):
+        # Core table, not the ORM entity: the ORM would treat the params
+        # dict as rows for a bulk INSERT
+        table = model.__table__
+        columns = [c for c in table.c if not c.primary_key]
+        overrides["game_id"] = bindparam("game_id", type_=Integer)
+        return insert(table).from_select(
+            [c.name for c in columns],
+            select(*(overrides.get(c.name, c) for c in columns))
+            .where(table.c.game_id == bindparam("template_id"))
+            .order_by(table.c.id),
+        )
+
+    return (
+        clone_rows(Player),
+        clone_rows(RegionState),
+        clone_rows(ReputationTile),
+        clone_rows(Component, position=new_position),
+    )
+
+
+def clone_game(db, template_id: int, rng_seed: int = None) -> int:
+    """
+    Copies a freshly created game (see create_game) with one INSERT ... SELECT
+    per table and returns the new game's id. The clone shares the template's
+    players and reputation tiles but gets its own deck order. Flushes only;
+    the caller commits.
+    """
+    if rng_seed is None:
+        rng_seed = random.randrange(2**31)
+    deck_sizes = tuple(
+        db.execute(
+            select(Component.zone, func.count())
+            .where(Component.game_id == template_id, Component.position.is_not(None))
+            .group_by(Component.zone)
+            .order_by(Component.zone)
+        ).all()
+    )
+
+    # Never added to the session; it only carries the seed through deck_order
+    game = Game(rng_seed=rng_seed, shuffle_count=0)
+    params = {"template_id": template_id}
+    for zone, size in deck_sizes:
+        for i, position in enumerate(deck_order(game, zone, size)):
+            params[f"{zone}_{i}"] = position
+
+    params["game_id"] = db.execute(
+        insert(Game)
+        .values(game_phase="setup", rng_seed=rng_seed, shuffle_count=game.shuffle_count)
+        .returning(Game.id)
+    ).scalar()
+    for statement in _clone_statements(deck_sizes):
+        db.execute(statement, params)
+    refresh_leaderboard(db, params["game_id"])
+    return params["game_id"]
+
+
+def create_games(
+    db, count: int, player_count: int = 2, rng_seed: int = None
+) -> list[int]:
+    """
+    Creates count games for load tests: one built from scratch, the rest
+    cloned from it. Commits every CREATE_BATCH_SIZE games.
+    """
+    rng = random.Random(rng_seed)
+    template_id = create_game(db, player_count, rng.randrange(2**31))
+    game_ids = [template_id]
+    for _ in range(count - 1):
+        game_ids.append(clone_game(db, template_id, rng.randrange(2**31)))
+        if len(game_ids) % CREATE_BATCH_SIZE == 0:
+            db.commit()
+    db.commit()
+    return game_ids
+
+
+def seed_initial_game(player_count: int = 2, rng_seed: int = None):
+    db = SessionLocal()
+    try:
+        create_game(db, player_count, rng_seed)
         db.commit()
         print("Database re-seeded successfully with Card Library and Components.")
 
@@ -139,3 +300,24 @@ def seed_initial_game():
         db.rollback()
     finally:
         db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed Disruptopia games.")
+    parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        game_ids = create_games(db, args.games, args.players, args.seed)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+    print(
+        f"Created {len(game_ids)} games in {elapsed:.2f}s "
+        f"({elapsed / len(game_ids) * 1000:.2f} ms per game)."
+    )
@@ -1,6 +1,11 @@
+import time
+
 from flask import Flask, request
 from flask_socketio import SocketIO, emit
-from backend.database import SessionLocal
+
+from backend import metrics, profiling, tracing
+from backend.database import SessionLocal, check_schema, finish_command
+from backend.deltas import pop_committed
 from backend.game_engine import draw_card, play_card
 from backend.enums import ZoneType
 
@@ -10,20 +15,34 @@ app = Flask(__name__)
 socketio = SocketIO(app, cors_allowed_origins="*")
 
 
+def emit_deltas(db):
+    """Pushes the versioned state deltas for everything db committed."""
+    for delta in pop_committed(db):
+        started = time.perf_counter()
+        socketio.emit("state_delta", delta)
+        metrics.FANOUT_LATENCY.observe(time.perf_counter() - started, "socketio")
+
+
 @socketio.on("connect")
 def handle_connect():
+    metrics.WS_CONNECTIONS.inc(1, "socketio")
     print(f"Client connected: {request.sid}")
 
 
 @socketio.on("disconnect")
 def handle_disconnect():
+    metrics.WS_CONNECTIONS.dec(1, "socketio")
     print(f"Client disconnected: {request.sid}")
 
 
 @socketio.on("draw_card_request")
+@metrics.timed_handler("draw_card_request")
+@tracing.traced_request("draw_card_request")
+@profiling.profiled_event("draw_card_request")
 def handle_draw_card(data):
     """
     Client sends: {'player_id': 1, 'deck_type': 'research_deck'}
+    (plus 'profile': <token> to profile this event)
     """
     db = SessionLocal()
     try:
@@ -33,7 +52,7 @@ def handle_draw_card(data):
         # Convert string back to our Enum
         deck_enum = ZoneType(deck_type_str)
 
-        result = draw_card(db, player_id, deck_enum)
+        result = finish_command(db, draw_card(db, player_id, deck_enum))
 
         if "error" in result:
             emit("error_notification", result, room=request.sid)
@@ -41,6 +60,7 @@ def handle_draw_card(data):
             # BROADCAST: Tell EVERYONE that a card was moved
             # This is the "Automated Movement" trigger
             socketio.emit("state_updated", result)
+            emit_deltas(db)
             print(f"Broadcasted draw: {result}")
 
     finally:
@@ -48,20 +68,28 @@ def handle_draw_card(data):
 
 
 @socketio.on("play_card_request")
+@metrics.timed_handler("play_card_request")
+@tracing.traced_request("play_card_request")
+@profiling.profiled_event("play_card_request")
 def handle_play_card(data):
     """
     Client sends: {'player_id': 1, 'card_id': 5, 'target_slot': 2}
+    (plus 'profile': <token> to profile this event)
     """
     db = SessionLocal()
     try:
-        result = play_card(
-            db, data.get("player_id"), data.get("card_id"), data.get("target_slot")
+        result = finish_command(
+            db,
+            play_card(
+                db, data.get("player_id"), data.get("card_id"), data.get("target_slot")
+            ),
         )
 
         if "error" in result:
             emit("error_notification", result, room=request.sid)
         else:
             socketio.emit("state_updated", result)
+            emit_deltas(db)
             print(f"Broadcasted play: {result}")
     finally:
         db.close()
@@ -70,4 +98,5 @@ def handle_play_card(data):
 if __name__ == "__main__":
     # TODO: Use eventlet or gevent for better production performance later,
     # but this works great for dev.
+    check_schema()
     socketio.run(app, debug=True, port=5000)
@@ -0,0 +1,408 @@
+"""
+Headless game simulator. Plays whole games against an in-memory SQLite
+database by calling the engine directly (no HTTP, no file I/O), using
+pluggable player policies. Doubles as a throughput baseline and, with
+several worker processes, as a load source.
+
+    python -m backend.simulator --games 200 --players 4 --policy greedy --workers 4
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.config import (
+    COMPUTE_NET_WORTH_REQ,
+    COMPUTE_UPGRADE_COSTS,
+    NET_WORTH_COSTS,
+    RECRUIT_COSTS,
+)
+from backend.database import create_db_engine, finish_command
+from backend.enums import ZoneType
+from backend.game_engine import (
+    apply_card_effect,
+    discard_card,
+    execute_round_start_draw,
+    place_worker,
+    play_card,
+    resolve_entire_round,
+)
+from backend.models import Base, Component, Player
+from backend.seed import create_game
+
+# A game ends when someone ships the final model, or after this many rounds
+MAX_ROUNDS = 12
+ACTIONS = (
+    "raise_funds",
+    "train_model",
+    "buy_chips",
+    "marketing",
+    "recruit",
+    "increase_net_worth",
+    "scale_presence",
+)
+
+# ==========================================
+# 1. LATENCY HISTOGRAMS
+# ==========================================
+
+
+class LatencyHistogram:
+    """
+    Counts latencies in power-of-two microsecond buckets. Fixed size, so
+    histograms from many processes merge by adding bucket counts.
+    """
+
+    BUCKETS = 32
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def record(self, seconds: float):
+        micros = max(1, int(seconds * 1_000_000))
+        self.counts[min(micros.bit_length() - 1, self.BUCKETS - 1)] += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram"):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound, in ms, of the bucket holding the q-th percentile."""
+        rank, seen = q / 100 * self.count, 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return (2 ** (bucket + 1)) / 1000
+        return 0.0
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+# ==========================================
+# 2. POLICIES
+# ==========================================
+
+
+class RandomPolicy:
+    """Places workers and plays cards uniformly at random."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def place_workers(self, player: Player) -> list[str]:
+        return [self.rng.choice(ACTIONS) for _ in range(player.total_workers)]
+
+    def cards_to_play(self, player: Player, hand: list[Component]) -> list:
+        """Returns (card, target_slot) pairs to play this round."""
+        plays = []
+        for card in hand:
+            if self.rng.random() < 0.5:
+                slot = self.rng.randint(1, 3) if card.card_details.is_effect else None
+                plays.append((card, slot))
+        return plays
+
+    def discards(self, hand: list[Component], count: int) -> list[Component]:
+        return self.rng.sample(hand, count)
+
+
+class GreedyPolicy(RandomPolicy):
+    """
+    Takes the most valuable action the player can afford right now, in a
+    fixed priority order, and plays every card it holds.
+    """
+
+    def _best_action(self, stats: dict) -> str:
+        next_nw = stats["net_worth_level"] + 1
+        nw_cost = NET_WORTH_COSTS.get(next_nw)
+        if nw_cost and stats["corporate_funds"] >= nw_cost["money"]:
+            if stats["reputation"] - nw_cost["reputation"] >= -3:
+                return "increase_net_worth"
+        if stats["compute_level"] > stats["model_version"]:
+            return "train_model"
+
+        next_compute = stats["compute_level"] + 1
+        chip_cost = COMPUTE_UPGRADE_COSTS.get(next_compute)
+        if (
+            chip_cost is not None
+            and stats["corporate_funds"] >= chip_cost
+            and stats["net_worth_level"] >= COMPUTE_NET_WORTH_REQ.get(next_compute, 0)
+        ):
+            return "buy_chips"
+
+        recruit = RECRUIT_COSTS.get(stats["total_workers"] + 1)
+        if recruit and stats["corporate_funds"] >= recruit["money"] + 3:
+            return "recruit"
+        if stats["reputation"] < 1:
+            return "marketing"
+        return "raise_funds"
+
+    def place_workers(self, player: Player) -> list[str]:
+        stats = {
+            name: getattr(player, name)
+            for name in (
+                "net_worth_level",
+                "corporate_funds",
+                "reputation",
+                "compute_level",
+                "model_version",
+                "total_workers",
+            )
+        }
+        # Plan on paper: assume each action lands before choosing the next
+        plan = []
+        for _ in range(player.total_workers):
+            action = self._best_action(stats)
+            plan.append(action)
+            if action == "raise_funds":
+                stats["corporate_funds"] = max(stats["corporate_funds"], 8)
+            elif action == "train_model":
+                stats["model_version"] += 1
+            elif action == "buy_chips":
+                stats["corporate_funds"] -= COMPUTE_UPGRADE_COSTS[
+                    stats["compute_level"] + 1
+                ]
+                stats["compute_level"] += 1
+            elif action == "increase_net_worth":
+                cost = NET_WORTH_COSTS[stats["net_worth_level"] + 1]
+                stats["corporate_funds"] -= cost["money"]
+                stats["reputation"] -= cost["reputation"]
+                stats["net_worth_level"] += 1
+            elif action == "recruit":
+                stats["corporate_funds"] -= RECRUIT_COSTS[stats["total_workers"] + 1][
+                    "money"
+                ]
+            elif action == "marketing":
+                stats["reputation"] += 1
+        return plan
+
+    def cards_to_play(self, player: Player, hand: list[Component]) -> list:
+        slots = iter((1, 2, 3))
+        return [
+            (card, next(slots, 1) if card.card_details.is_effect else None)
+            for card in hand
+        ]
+
+
+POLICIES = {"random": RandomPolicy, "greedy": GreedyPolicy}
+
+
+# ==========================================
+# 3. PLAYING GAMES
+# ==========================================
+
+
+class Simulation:
+    """Plays games on one in-memory database and collects timings."""
+
+    def __init__(self, policy: str = "random", seed: int = None):
+        self.rng = random.Random(seed)
+        self.policy_names = list(POLICIES) if policy == "mixed" else [policy]
+        self.engine = create_db_engine("sqlite://")
+        Base.metadata.create_all(bind=self.engine)
+        self.session = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.latency: dict[str, LatencyHistogram] = {}
+        self.games = 0
+        self.rounds = 0
+
+    def _timed(self, name: str, fn, db: Session, *args) -> dict:
+        started = time.perf_counter()
+        result = fn(db, *args)
+        if name != "resolve_entire_round":
+            # Like the endpoints: one commit per command
+            finish_command(db, result)
+        self.latency.setdefault(name, LatencyHistogram()).record(
+            time.perf_counter() - started
+        )
+        return result
+
+    def play_game(self, player_count: int, max_rounds: int = MAX_ROUNDS) -> int:
+        """Plays one game to the end; returns the number of rounds played."""
+        db = self.session()
+        try:
+            game_id = create_game(db, player_count, self.rng.randrange(2**31))
+            db.commit()
+            players = db.scalars(
+                select(Player).where(Player.game_id == game_id).order_by(Player.id)
+            ).all()
+            policies = {
+                p.id: POLICIES[self.rng.choice(self.policy_names)](
+                    random.Random(self.rng.random())
+                )
+                for p in players
+            }
+
+            rounds = 0
+            while rounds < max_rounds:
+                for player in players:
+                    self._play_cards(db, player, policies[player.id])
+                for player in players:
+                    actions = policies[player.id].place_workers(player)
+                    for worker_number, action in enumerate(actions, start=1):
+                        self._timed(
+                            "place_worker",
+                            place_worker,
+                            db,
+                            player.id,
+                            worker_number,
+                            action,
+                        )
+                self._timed("resolve_entire_round", resolve_entire_round, db, game_id)
+                rounds += 1
+                if any(p.model_version >= 7 for p in players):
+                    break
+        finally:
+            db.close()
+
+        self.games += 1
+        self.rounds += rounds
+        return rounds
+
+    def _play_cards(self, db: Session, player: Player, policy: RandomPolicy):
+        result = self._timed(
+            "round_start_draw",
+            execute_round_start_draw,
+            db,
+            player.id,
+            ZoneType.RESEARCH_DECK,
+        )
+        hand = db.scalars(
+            select(Component)
+            .where(Component.owner_id == player.id)
+            .where(Component.zone == f"hand_p{player.id}")
+            .order_by(Component.id)
+        ).all()
+
+        if result.get("status") == "must_discard":
+            discards = policy.discards(hand, result["count"])
+            for card in discards:
+                self._timed("discard_card", discard_card, db, player.id, card.id)
+            hand = [c for c in hand if c not in discards]
+
+        for card, slot in policy.cards_to_play(player, hand):
+            played = self._timed("play_card", play_card, db, player.id, card.id, slot)
+            if played.get("action") == "card_played" and slot is None:
+                self._timed(
+                    "apply_card_effect", apply_card_effect, db, player.id, card.id
+                )
+
+    def run(self, games: int, player_count: int, max_rounds: int = MAX_ROUNDS):
+        try:
+            for _ in range(games):
+                self.play_game(player_count, max_rounds)
+        finally:
+            self.engine.dispose()
+        return self
+
+
+def _simulate_batch(args: tuple) -> dict:
+    """Runs a share of the games inside a pool process."""
+    games, player_count, policy, seed, max_rounds = args
+    started = time.perf_counter()
+    sim = Simulation(policy, seed).run(games, player_count, max_rounds)
+    return {
+        "games": sim.games,
+        "rounds": sim.rounds,
+        "latency": sim.latency,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+def simulate(
+    games: int,
+    player_count: int = 4,
+    policy: str = "random",
+    workers: int = 1,
+    seed: int = None,
+    max_rounds: int = MAX_ROUNDS,
+) -> dict:
+    """
+    Plays games across worker processes (each with its own in-memory
+    database) and reports throughput and per-action latency.
+    """
+    workers = max(1, min(workers, games))
+    rng = random.Random(seed)
+    batches = [
+        (
+            games // workers + (i < games % workers),
+            player_count,
+            policy,
+            rng.randrange(2**31),
+            max_rounds,
+        )
+        for i in range(workers)
+    ]
+
+    started = time.perf_counter()
+    if workers == 1:
+        results = [_simulate_batch(batches[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_batch, batches))
+    elapsed = time.perf_counter() - started
+
+    latency: dict[str, LatencyHistogram] = {}
+    for result in results:
+        for name, histogram in result["latency"].items():
+            latency.setdefault(name, LatencyHistogram()).merge(histogram)
+    total_games = sum(r["games"] for r in results)
+    total_rounds = sum(r["rounds"] for r in results)
+    return {
+        "games": total_games,
+        "rounds": total_rounds,
+        "workers": workers,
+        "elapsed_s": round(elapsed, 3),
+        "games_per_second": round(total_games / elapsed, 3),
+        "rounds_per_second": round(total_rounds / elapsed, 3),
+        "latency": {name: h.summary() for name, h in sorted(latency.items())},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--policy", choices=[*POLICIES, "mixed"], default="random")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS)
+    args = parser.parse_args()
+
+    report = simulate(
+        args.games, args.players, args.policy, args.workers, args.seed, args.max_rounds
+    )
+    print(
+        f"{report['games']} games / {report['rounds']} rounds in "
+        f"{report['elapsed_s']}s on {report['workers']} workers: "
+        f"{report['games_per_second']} games/s, "
+        f"{report['rounds_per_second']} rounds/s"
+    )
+    print(
+        f"{'action (ms)':>22} {'count':>8} {'mean':>8} {'p50':>8} {'p90':>8} {'p99':>8}"
+    )
+    for name, s in report["latency"].items():
+        print(
+            f"{name:>22} {s['count']:>8} {s['mean_ms']:>8.3f} "
+            f"{s['p50_ms']:>8.3f} {s['p90_ms']:>8.3f} {s['p99_ms']:>8.3f}"
+        )
@@ -0,0 +1,306 @@
+"""
+Optional request tracing, written as OpenTelemetry (OTLP/JSON) span trees.
+
+A sampled HTTP request or websocket event opens a root span. Engine
+functions decorated with @traced open child spans, and every SQL statement
+issued underneath becomes a leaf span with its duration. When the root span
+ends, the whole trace is written as one OTLP/JSON ExportTraceServiceRequest
+line to a rotating local file, which the OpenTelemetry Collector's
+otlpjsonfile receiver (or jq) can read as is.
+
+Tracing is off unless DISRUPTOPIA_TRACE_SAMPLE_RATE is above 0. Requests
+that are not sampled never set a current span, so every hook returns after
+a single context variable lookup.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import time
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Fraction of requests traced, from 0 (off) to 1 (every request)
+TRACE_SAMPLE_RATE = float(os.getenv("DISRUPTOPIA_TRACE_SAMPLE_RATE", "0"))
+TRACE_FILE = os.getenv(
+    "DISRUPTOPIA_TRACE_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces", "traces.jsonl"),
+)
+TRACE_MAX_BYTES = int(os.getenv("DISRUPTOPIA_TRACE_MAX_BYTES", str(20 * 1024**2)))
+TRACE_BACKUPS = int(os.getenv("DISRUPTOPIA_TRACE_BACKUPS", "5"))
+
+# OTLP enum values
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar(
+    "current_span", default=None
+)
+# The rotating file, opened on the first export
+_writer = None
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Span:
+    """One timed operation. Finished spans are collected on their trace."""
+
+    __slots__ = (
+        "trace",
+        "span_id",
+        "parent_id",
+        "name",
+        "kind",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "error",
+    )
+
+    def __init__(self, trace: list, name: str, parent=None, kind=KIND_INTERNAL):
+        self.trace = trace  # [trace id, finished spans]
+        self.span_id = _new_id(64)
+        self.parent_id = parent.span_id if parent else ""
+        self.name = name
+        self.kind = kind
+        self.attributes = {}
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def end(self, end_ns: int = None):
+        self.end_ns = end_ns or time.time_ns()
+        self.trace[1].append(self)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace[0],
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": STATUS_OK},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.error is not None:
+            span["status"] = {"code": STATUS_ERROR, "message": self.error}
+        return span
+
+
+# ==========================================
+# 1. EXPORT
+# ==========================================
+
+
+def configure(
+    path: str = None,
+    sample_rate: float = None,
+    max_bytes: int = None,
+    backups: int = None,
+):
+    """Changes where traces go and how many are kept (used by tests too)."""
+    global TRACE_FILE, TRACE_SAMPLE_RATE, TRACE_MAX_BYTES, TRACE_BACKUPS, _writer
+    TRACE_FILE = path or TRACE_FILE
+    TRACE_MAX_BYTES = max_bytes or TRACE_MAX_BYTES
+    TRACE_BACKUPS = backups if backups is not None else TRACE_BACKUPS
+    if sample_rate is not None:
+        TRACE_SAMPLE_RATE = sample_rate
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+
+
+def _file() -> RotatingFileHandler:
+    global _writer
+    if _writer is None:
+        os.makedirs(os.path.dirname(TRACE_FILE), exist_ok=True)
+        _writer = RotatingFileHandler(
+            TRACE_FILE, maxBytes=TRACE_MAX_BYTES, backupCount=TRACE_BACKUPS
+        )
+    return _writer
+
+
+def export(trace: list):
+    """Writes a finished trace as one OTLP/JSON line."""
+    request = {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [_attribute("service.name", "disruptopia")]},
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "backend.tracing"},
+                        "spans": [span.to_otlp() for span in trace[1]],
+                    }
+                ],
+            }
+        ]
+    }
+    line = json.dumps(request, separators=(",", ":"))
+    # handle() takes the handler's lock and rotates the file when it is full
+    _file().handle(logging.makeLogRecord({"msg": line, "levelno": logging.INFO}))
+
+
+# ==========================================
+# 2. SPANS
+# ==========================================
+
+
+@contextlib.contextmanager
+def start_trace(name: str, kind: int = KIND_SERVER, **attributes):
+    """
+    Opens a root span for one request, if the request is sampled. Yields the
+    span, or None when it isn't traced; the trace is exported on exit.
+    """
+    if TRACE_SAMPLE_RATE <= 0 or random.random() >= TRACE_SAMPLE_RATE:
+        yield None
+        return
+    root = Span([_new_id(128), []], name, kind=kind)
+    root.attributes.update(attributes)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as exc:
+        root.error = repr(exc)
+        raise
+    finally:
+        _current_span.reset(token)
+        root.end()
+        export(root.trace)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """A child of the current span; does nothing outside a sampled trace."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(parent.trace, name, parent)
+    child.attributes.update(attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.error = repr(exc)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+def traced(fn):
+    """
+    Decorator giving an engine function its own span. An {"error": ...}
+    result marks the span as failed.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _current_span.get() is None:
+            return fn(*args, **kwargs)
+        with span(name, **{"code.function": name}) as current:
+            result = fn(*args, **kwargs)
+            if isinstance(result, dict) and "error" in result:
+                current.error = str(result["error"])
+            return result
+
+    return wrapper
+
+
+def traced_request(name: str):
+    """Decorator opening a root span for a websocket event handler."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with start_trace(name, **{"messaging.operation": name}):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a root span for each sampled HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or TRACE_SAMPLE_RATE <= 0:
+            return await self.app(scope, receive, send)
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        with start_trace(
+            method, **{"http.request.method": method, "url.path": scope["path"]}
+        ) as root:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                if root is not None:
+                    route = getattr(scope.get("route"), "path", None)
+                    if route:
+                        root.name = f"{method} {route}"
+                        root.attributes["http.route"] = route
+                    root.attributes["http.response.status_code"] = status[0]
+                    if status[0] >= 500:
+                        root.error = f"HTTP {status[0]}"
+
+
+# ==========================================
+# 3. SQL HOOKS
+# ==========================================
+
+# Like the metrics hooks, the start time lives on the statement's execution
+# context, so a statement that raises leaves nothing behind.
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_span.get() is not None:
+        context.trace_started = time.time_ns()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_statement(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "trace_started", None)
+    parent = _current_span.get()
+    if started is None or parent is None:
+        return
+    leaf = Span(parent.trace, statement.split(None, 1)[0].upper(), parent, KIND_CLIENT)
+    leaf.start_ns = started
+    leaf.attributes["db.system"] = conn.dialect.name
+    leaf.attributes["db.statement"] = statement
+    if executemany:
+        leaf.attributes["db.executemany"] = True
+    leaf.end()
@@ -0,0 +1,111 @@
+"""
+The region graph, compiled to bitmasks.
+
+Bit r of a mask stands for region r, so a player's presence is one int and
+"is this region next to anything I hold" is a shift and an and. Python ints
+have no width limit, which keeps this working on maps with hundreds of
+regions (see grid_map).
+"""
+
+from backend.config import WORLD_MAP
+
+
+def mask_of(regions) -> int:
+    mask = 0
+    for region in regions:
+        mask |= 1 << region
+    return mask
+
+
+def regions_in(mask: int) -> list[int]:
+    """The region ids set in mask, ascending."""
+    regions = []
+    while mask:
+        low = mask & -mask
+        regions.append(low.bit_length() - 1)
+        mask ^= low
+    return regions
+
+
+def grid_map(rows: int, cols: int) -> dict[int, list[int]]:
+    """
+    A rows x cols board numbered row by row from 1, each region touching
+    its orthogonal neighbours. The standard board is grid_map(2, 5).
+    """
+    adjacency = {}
+    for row in range(rows):
+        for col in range(cols):
+            region = row * cols + col + 1
+            adjacency[region] = [
+                r * cols + c + 1
+                for r, c in (
+                    (row - 1, col),
+                    (row, col - 1),
+                    (row, col + 1),
+                    (row + 1, col),
+                )
+                if 0 <= r < rows and 0 <= c < cols
+            ]
+    return adjacency
+
+
+class WorldMap:
+    """Adjacency masks and all-pairs hop distances for one region graph."""
+
+    def __init__(self, adjacency: dict[int, list[int]]):
+        self.regions = sorted(adjacency)
+        self.all_regions = mask_of(self.regions)
+        size = self.regions[-1] + 1 if self.regions else 0
+        # neighbours[r] is the mask of regions touching r
+        self.neighbours = [0] * size
+        for region, touching in adjacency.items():
+            self.neighbours[region] = mask_of(touching) & ~(1 << region)
+        self.distances = [self._hops_from(region) for region in range(size)]
+
+    def _hops_from(self, source: int) -> list:
+        """Breadth-first hop counts from source; None where unreachable."""
+        hops = [None] * len(self.neighbours)
+        if not self.all_regions >> source & 1:
+            return hops
+        seen = layer = 1 << source
+        depth = 0
+        while layer:
+            following = 0
+            for region in regions_in(layer):
+                hops[region] = depth
+                following |= self.neighbours[region]
+            layer = following & ~seen
+            seen |= layer
+            depth += 1
+        return hops
+
+    def is_region(self, region: int) -> bool:
+        return 0 <= region < len(self.neighbours) and bool(
+            self.all_regions >> region & 1
+        )
+
+    def adjacent(self, a: int, b: int) -> bool:
+        return (
+            self.is_region(a)
+            and self.is_region(b)
+            and bool(self.neighbours[a] >> b & 1)
+        )
+
+    def frontier(self, presence: int) -> int:
+        """Regions next to the presence mask that it doesn't already hold."""
+        reach = 0
+        for region in regions_in(presence):
+            reach |= self.neighbours[region]
+        return reach & ~presence
+
+    def expand(self, presence: int, frontier: int, region: int) -> tuple[int, int]:
+        """The (presence, frontier) masks after adding region, in O(1)."""
+        presence |= 1 << region
+        return presence, (frontier | self.neighbours[region]) & ~presence
+
+    def distance(self, a: int, b: int):
+        """Hops between two regions, or None if b can't be reached."""
+        return self.distances[a][b]
+
+
+WORLD = WorldMap(WORLD_MAP)
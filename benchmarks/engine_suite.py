@@ -0,0 +1,355 @@
+"""
+Microbenchmarks for the hot engine entry points, checked against recorded
+baselines.
+
+Every benchmark runs against a private in-memory SQLite database seeded with
+one game per player count. Each iteration gets an untimed setup; commands
+that only flush are rolled back afterwards, so every iteration starts from
+the same state. For each benchmark the suite reports the median wall time,
+the SQL statements issued and the peak memory allocated (tracemalloc) per
+call.
+
+Results are compared with benchmarks/baselines.json. A metric regresses when
+it exceeds its baseline times the threshold for that metric. Thresholds come
+from the file's "thresholds" block, can be overridden per benchmark, and on
+the command line:
+
+    python -m benchmarks.engine_suite
+    python -m benchmarks.engine_suite --only resolve --threshold wall_ms=2.0
+    python -m benchmarks.engine_suite --update   # record new baselines
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, NamedTuple
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend import game_engine
+from backend.database import create_memory_engine
+from backend.deltas import pop_committed
+from backend.enums import ZoneType
+from backend.event_log import take_snapshot
+from backend.main import app, get_db
+from backend.models import Base, Component, Player
+from backend.seed import clone_game, create_game
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+METRICS = ("wall_ms", "queries", "alloc_kib")
+# Used when the baseline file has no thresholds of its own. Wall time is
+# noisy on shared machines; query counts should not move at all.
+DEFAULT_THRESHOLDS = {"wall_ms": 2.0, "queries": 1.0, "alloc_kib": 1.3}
+PLAYER_COUNTS = (2, 3, 4, 5)
+ROUND_ACTIONS = ("raise_funds", "marketing", "buy_chips")
+
+
+class Benchmark(NamedTuple):
+    name: str
+    # setup(bench) runs untimed and returns the call to measure
+    setup: Callable[["EngineBench"], Callable[[], object]]
+
+
+class EngineBench:
+    """The in-memory database, its seeded games and a TestClient bound to it."""
+
+    def __init__(self, seed: int = 1):
+        self.seed = seed
+        self.engine = create_memory_engine()
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(autoflush=False, bind=self.engine)
+        self.db = self.Session()
+
+        # The statement counter sees the TestClient's worker threads too
+        self.queries = 0
+        event.listen(self.engine, "before_cursor_execute", self._count_query)
+
+        self.templates = {}
+        for player_count in PLAYER_COUNTS:
+            game_id = create_game(self.db, player_count, rng_seed=seed)
+            self._warm_up(game_id)
+            self.templates[player_count] = game_id
+        self.db.commit()
+        self._clones = 0
+
+        app.dependency_overrides[get_db] = self._get_db
+        self.client = TestClient(app)
+
+    def _count_query(self, conn, cursor, statement, parameters, context, many):
+        self.queries += 1
+
+    def _get_db(self):
+        db = self.Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def player_ids(self, player_count: int = 2) -> list[int]:
+        game_id = self.templates[player_count]
+        return list(
+            self.db.scalars(
+                select(Player.id)
+                .where(Player.game_id == game_id)
+                .order_by(Player.player_order)
+            )
+        )
+
+    def fresh_game(self, player_count: int) -> int:
+        """A committed copy of the template, for commands that commit."""
+        self._clones += 1
+        game_id = clone_game(
+            self.db, self.templates[player_count], self.seed + self._clones
+        )
+        self._warm_up(game_id)
+        self.db.commit()
+        return game_id
+
+    def _warm_up(self, game_id: int):
+        # Bring a fresh game to its steady state: the first logged command
+        # won't take a snapshot
+        take_snapshot(self.db, game_id, 0)
+
+    def reset(self):
+        """Undoes whatever the last iteration flushed."""
+        self.db.rollback()
+        pop_committed(self.db)
+
+    def close(self):
+        app.dependency_overrides.pop(get_db, None)
+        self.db.close()
+        self.engine.dispose()
+
+
+# ==========================================
+# 1. BENCHMARKS
+# ==========================================
+
+
+def _draw_card(bench: EngineBench):
+    player_id = bench.player_ids()[0]
+    return lambda: game_engine.draw_card(bench.db, player_id, ZoneType.RESEARCH_DECK)
+
+
+def _play_card(bench: EngineBench):
+    player_id = bench.player_ids()[0]
+    drawn = game_engine.draw_card(bench.db, player_id, ZoneType.RESEARCH_DECK)
+    card_id = drawn["component_id"]
+    slot = 1 if bench.db.get(Component, card_id).card_details.is_effect else None
+    return lambda: game_engine.play_card(bench.db, player_id, card_id, slot)
+
+
+def _train_model(bench: EngineBench):
+    player_id = bench.player_ids()[0]
+    bench.db.execute(
+        update(Player)
+        .where(Player.id == player_id)
+        .values(compute_level=3, model_version=1, net_worth_level=1)
+    )
+    return lambda: game_engine.execute_train_model(bench.db, player_id, 2)
+
+
+def _check_reputation_tiles(bench: EngineBench):
+    first, second = bench.player_ids()
+    # The second player holds the tiles, so the first has to steal them
+    bench.db.execute(
+        update(Player)
+        .where(Player.id == second)
+        .values(reputation=6, net_worth_level=1)
+    )
+    game_engine.check_reputation_tiles(bench.db, second)
+    bench.db.execute(
+        update(Player).where(Player.id == first).values(reputation=7, net_worth_level=1)
+    )
+    bench.db.expire_all()
+    return lambda: game_engine.check_reputation_tiles(bench.db, first)
+
+
+def _leaderboard(bench: EngineBench):
+    game_id = bench.templates[2]
+    return lambda: game_engine.calculate_game_leaderboard(bench.db, game_id)
+
+
+def _resolve_round(player_count: int):
+    def setup(bench: EngineBench):
+        game_id = bench.fresh_game(player_count)
+        for player_id in bench.db.scalars(
+            select(Player.id).where(Player.game_id == game_id)
+        ):
+            for worker_number, action in enumerate(ROUND_ACTIONS, start=1):
+                game_engine.place_worker(bench.db, player_id, worker_number, action)
+        bench.db.commit()
+        bench.db.expire_all()
+        return lambda: game_engine.resolve_entire_round(bench.db, game_id)
+
+    return setup
+
+
+def _http_get(path: str):
+    def setup(bench: EngineBench):
+        url = path.format(game_id=bench.templates[5])
+        return lambda: bench.client.get(url)
+
+    return setup
+
+
+BENCHMARKS = (
+    Benchmark("draw_card", _draw_card),
+    Benchmark("play_card", _play_card),
+    Benchmark("execute_train_model", _train_model),
+    Benchmark("check_reputation_tiles", _check_reputation_tiles),
+    Benchmark("calculate_game_leaderboard", _leaderboard),
+    *(
+        Benchmark(f"resolve_entire_round[{n}p]", _resolve_round(n))
+        for n in PLAYER_COUNTS
+    ),
+    Benchmark("GET /state", _http_get("/game/{game_id}/state")),
+    Benchmark("GET /leaderboard", _http_get("/game/{game_id}/leaderboard")),
+)
+
+
+# ==========================================
+# 2. MEASURING
+# ==========================================
+
+
+def measure(bench: EngineBench, benchmark: Benchmark, iterations: int) -> dict:
+    """Median wall time, queries and peak allocation of one call."""
+    times, queries, allocs = [], [], []
+    for _ in range(iterations):
+        call = benchmark.setup(bench)
+        before = bench.queries
+        started = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - started)
+        queries.append(bench.queries - before)
+        bench.reset()
+
+    # Tracing slows everything down, so allocations get their own pass
+    for _ in range(max(1, iterations // 5)):
+        call = benchmark.setup(bench)
+        tracemalloc.start()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        allocs.append(peak / 1024)
+        bench.reset()
+
+    return {
+        "wall_ms": round(statistics.median(times) * 1000, 3),
+        "queries": max(queries),
+        "alloc_kib": round(statistics.median(allocs), 1),
+    }
+
+
+def run_suite(iterations: int = 50, only: str = None, seed: int = 1) -> dict[str, dict]:
+    """Runs every benchmark (or those matching the `only` glob)."""
+    bench = EngineBench(seed)
+    try:
+        return {
+            benchmark.name: measure(bench, benchmark, iterations)
+            for benchmark in BENCHMARKS
+            if only is None or fnmatch.fnmatch(benchmark.name, f"*{only}*")
+        }
+    finally:
+        bench.close()
+
+
+# ==========================================
+# 3. BASELINES
+# ==========================================
+
+
+def load_baselines(path: str = BASELINE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {"thresholds": dict(DEFAULT_THRESHOLDS), "benchmarks": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baselines(results: dict, path: str = BASELINE_PATH):
+    """Records results as the new baselines, keeping any thresholds."""
+    baselines = load_baselines(path)
+    for name, metrics in results.items():
+        entry = baselines["benchmarks"].setdefault(name, {})
+        entry.update(metrics)
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def find_regressions(
+    results: dict, baselines: dict, overrides: dict = None
+) -> list[str]:
+    """
+    Compares results with their baselines and describes every metric above
+    baseline * threshold. Benchmarks without a baseline are skipped.
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **baselines.get("thresholds", {})}
+    regressions = []
+    for name, metrics in results.items():
+        baseline = baselines["benchmarks"].get(name)
+        if baseline is None:
+            continue
+        limits = {**thresholds, **baseline.get("thresholds", {}), **(overrides or {})}
+        for metric, value in metrics.items():
+            if metric not in limits or metric not in baseline:
+                continue
+            allowed = baseline[metric] * limits[metric]
+            if value > allowed:
+                regressions.append(
+                    f"{name}: {metric} {value} > {allowed:g} "
+                    f"(baseline {baseline[metric]} x {limits[metric]})"
+                )
+    return regressions
+
+
+def _parse_threshold(text: str) -> tuple:
+    metric, _, ratio = text.partition("=")
+    if metric not in METRICS:
+        raise argparse.ArgumentTypeError(f"metric must be one of {METRICS}")
+    return metric, float(ratio)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--only", help="Run benchmarks whose name contains this")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--threshold",
+        type=_parse_threshold,
+        action="append",
+        default=[],
+        help="Override a regression threshold, e.g. wall_ms=2.0",
+    )
+    parser.add_argument(
+        "--update", action="store_true", help="Record these results as baselines"
+    )
+    args = parser.parse_args()
+
+    results = run_suite(args.iterations, args.only)
+    baselines = load_baselines(args.baseline)
+    print(f"{'benchmark':<30} {'wall ms':>9} {'queries':>8} {'alloc KiB':>10}")
+    for name, metrics in results.items():
+        print(
+            f"{name:<30} {metrics['wall_ms']:>9.3f} {metrics['queries']:>8} "
+            f"{metrics['alloc_kib']:>10.1f}"
+        )
+
+    if args.update:
+        save_baselines(results, args.baseline)
+        print(f"Baselines written to {args.baseline}")
+        sys.exit(0)
+
+    regressions = find_regressions(results, baselines, dict(args.threshold))
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,105 @@
+"""
+Measures event-loop lag while place-worker requests are in flight.
+
+A ticker coroutine sleeps TICK seconds in a loop and records how late it
+wakes up. Engine work that blocks the loop shows up directly as lag. The
+script compares the old inline path (engine called on the loop) with the
+/actions/place-worker endpoint, which runs the engine on the DB pool.
+
+    python -m benchmarks.event_loop_lag --requests 200 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+# Benchmark against a throwaway database, never the dev one
+os.environ.setdefault(
+    "DISRUPTOPIA_DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'lag_bench.db')}",
+)
+
+import httpx  # noqa: E402
+
+from backend import game_engine  # noqa: E402
+from backend.database import SessionLocal, engine  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.models import Base  # noqa: E402
+from backend.seed import seed_initial_game  # noqa: E402
+
+TICK = 0.005
+
+
+async def ticker(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+
+async def inline_request(i: int):
+    """The old path: a synchronous session used directly on the loop."""
+    db = SessionLocal()
+    try:
+        game_engine.place_worker(db, 1, i % 3 + 1, "marketing")
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run(name: str, make_request, requests: int, concurrency: int):
+    lags, stop = [], asyncio.Event()
+    tick_task = asyncio.create_task(ticker(stop, lags))
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with limit:
+            await make_request(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick_task
+
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    print(
+        f"{name:>10}: {requests / elapsed:8.1f} req/s | loop lag "
+        f"p50 {statistics.median(lags_ms):6.2f} ms, "
+        f"p99 {lags_ms[int(len(lags_ms) * 0.99) - 1]:6.2f} ms, "
+        f"max {lags_ms[-1]:6.2f} ms"
+    )
+
+
+async def main(requests: int, concurrency: int):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    seed_initial_game()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+
+        async def http_request(i: int):
+            await c.post(
+                "/actions/place-worker",
+                json={
+                    "player_id": 1,
+                    "game_id": 1,
+                    "worker_ids": [i % 3 + 1],
+                    "action_type": "marketing",
+                },
+            )
+
+        await run("inline", inline_request, requests, concurrency)
+        await run("offloaded", http_request, requests, concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
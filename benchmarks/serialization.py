@@ -0,0 +1,136 @@
+"""
+Compares JSON serialization paths for the /game/{id}/state payload.
+
+"generic" is what FastAPI does for a plain dict return: jsonable_encoder
+walks the structure, then JSONResponse runs it through the stdlib json
+module. "validated" is the same after checking the payload against the
+response_model. "fast" is FastJSONResponse: pydantic-core writes the dict
+straight to bytes.
+
+    python -m benchmarks.serialization --players 5 --iterations 2000
+"""
+
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic_core import to_json
+
+from backend.schemas import GameStateResponse
+
+
+def make_payload(players: int, hand_size: int = 5) -> dict:
+    """A realistic late-game state: full hands, filled effect slots."""
+    card_ids = iter(range(1, 10_000))
+
+    def card():
+        card_id = next(card_ids)
+        return {
+            "id": card_id,
+            "name": f"Card {card_id}",
+            "deck": "research_deck",
+            "cost": 2,
+            "is_effect": card_id % 2 == 0,
+        }
+
+    return {
+        "game_id": 1,
+        "version": 42,
+        "phase": "strategy",
+        "p1_index": 0,
+        "players": [
+            {
+                "id": pid,
+                "name": f"Player {pid}",
+                "power": 12,
+                "income": 4,
+                "net_worth": 1,
+                "total_worker_count": 6,
+                "corporate_funds": 15,
+                "personal_funds": 7,
+                "reputation": 3,
+                "compute_level": 4,
+                "model_version": 3,
+                "presence_count": 4,
+                "subsidy_tokens": 2,
+                "vp": 3,
+                "placed_worker_numbers": list(range(1, 7)),
+                "hand": [card() for _ in range(hand_size)],
+                "active_effects": {slot: card() for slot in (1, 2, 3)},
+            }
+            for pid in range(1, players + 1)
+        ],
+        "placements": [
+            {"player_id": pid, "action_type": "buy_chips", "worker_number": n}
+            for pid in range(1, players + 1)
+            for n in range(1, 7)
+        ],
+        "regions": [
+            {
+                "region_id": r,
+                "subsidy_tokens_remaining": 3,
+                "presence": list(range(1, players + 1)),
+            }
+            for r in range(1, 11)
+        ],
+        "tiles": [
+            {
+                "id": t,
+                "level": t % 4,
+                "name": f"Tile {t}",
+                "effect_code": "hand_limit_6",
+                "owner_id": t % players or None,
+            }
+            for t in range(1, 13)
+        ],
+    }
+
+
+def generic(payload: dict) -> bytes:
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def validated(payload: dict) -> bytes:
+    return GameStateResponse.model_validate(payload).model_dump_json().encode()
+
+
+def fast(payload: dict) -> bytes:
+    return to_json(payload)
+
+
+def measure(name: str, serialize, payload: dict, iterations: int):
+    size = len(serialize(payload))
+    started = time.perf_counter()
+    for _ in range(iterations):
+        serialize(payload)
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{name:>10}: {iterations / elapsed:9.0f} payloads/s | "
+        f"{size * iterations / elapsed / 1e6:7.1f} MB/s | {size} bytes each"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    payload = make_payload(args.players)
+    # Every path must produce the same document
+    assert json.loads(generic(payload)) == json.loads(fast(payload))
+
+    for name, serialize in (
+        ("generic", generic),
+        ("validated", validated),
+        ("fast", fast),
+    ):
+        measure(name, serialize, payload, args.iterations)
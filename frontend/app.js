@@ -24,7 +24,84 @@ async function init() {
 
 function connectWebSocket() {
     socket = new WebSocket(`ws://localhost:8000/ws/${GAME_ID}`);
-    socket.onmessage = () => refreshData();
+    socket.onmessage = (event) => {
+        const msg = JSON.parse(event.data);
+        // Only state deltas change what we render; other messages are notices
+        if (msg.type === "STATE_DELTA") handleDelta(msg);
+    };
+}
+
+// Delta player fields -> field names used by /game/{id}/state
+const DELTA_PLAYER_FIELDS = {
+    user_name: "name",
+    power: "power",
+    income: "income",
+    net_worth_level: "net_worth",
+    total_workers: "total_worker_count",
+    corporate_funds: "corporate_funds",
+    personal_funds: "personal_funds",
+    reputation: "reputation",
+    compute_level: "compute_level",
+    model_version: "model_version",
+    presence_count: "presence_count",
+    subsidy_tokens: "subsidy_tokens",
+    vp: "vp",
+};
+
+function handleDelta(delta) {
+    if (!currentGameState || delta.version <= currentGameState.version) return;
+    if (delta.version !== currentGameState.version + 1) {
+        // We missed at least one delta; fall back to a full refetch
+        refreshData();
+        return;
+    }
+    if (delta.cards_moved.length) {
+        // Drawn cards aren't described in the delta; refetch hands instead
+        refreshData();
+        return;
+    }
+    applyDelta(currentGameState, delta);
+    const me = currentGameState.players.find(p => p.id === PLAYER_ID) || currentGameState.players[0];
+    if (me) updateUI(me);
+}
+
+function applyDelta(state, delta) {
+    // 1. Placements
+    const key = (p) => `${p.player_id}:${p.worker_number}`;
+    if (delta.placements_cleared) state.placements = [];
+    const removed = new Set(delta.placements_removed.map(key));
+    const added = new Map(delta.placements_added.map(p => [key(p), p]));
+    state.placements = state.placements
+        .filter(p => !removed.has(key(p)) && !added.has(key(p)))
+        .concat([...added.values()]);
+
+    // 2. Players
+    for (const player of state.players) {
+        const changes = delta.players[player.id] || {};
+        for (const [field, value] of Object.entries(changes)) {
+            if (field in DELTA_PLAYER_FIELDS) player[DELTA_PLAYER_FIELDS[field]] = value;
+        }
+        player.placed_worker_numbers = state.placements
+            .filter(p => p.player_id === player.id)
+            .map(p => p.worker_number);
+    }
+
+    // 3. Regions, presence and reputation tiles
+    for (const region of state.regions) {
+        if (region.region_id in delta.regions) {
+            region.subsidy_tokens_remaining = delta.regions[region.region_id];
+        }
+        for (const p of delta.presence_added) {
+            if (p.region_id === region.region_id) region.presence.push(p.player_id);
+        }
+    }
+    for (const tile of state.tiles) {
+        if (tile.id in delta.tiles) tile.owner_id = delta.tiles[tile.id];
+    }
+    if (delta.game.game_phase !== undefined) state.phase = delta.game.game_phase;
+    if (delta.game.p1_token_index !== undefined) state.p1_index = delta.game.p1_token_index;
+
+    state.version = delta.version;
 }
 
 async function refreshData() {
@@ -1,5 +1,9 @@
 # tests/conftest.py
+import contextlib
+
 import pytest
+from sqlalchemy import event
+
 from backend.database import SessionLocal, engine
 from backend.models import Base
 from backend.seed import seed_initial_game
@@ -23,3 +27,26 @@ def db_session():
         session.close()
         # to keep the DB file small
         Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def record_statements():
+    """
+    Returns a context manager collecting the SQL statements sent to the
+    engine inside its block: with record_statements() as statements: ...
+    """
+
+    @contextlib.contextmanager
+    def recording():
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    return recording
@@ -1,5 +1,14 @@
+import asyncio
+import threading
+
 from fastapi.testclient import TestClient
-from backend.main import app
+
+from backend import metrics
+from backend.enums import ZoneType
+from backend.game_engine import draw_card, place_worker
+from backend.main import ConnectionManager, app, manager
+from backend.models import Player
+from backend.schemas import GameStateResponse, LeaderboardRow
 
 client = TestClient(app)
 
@@ -23,3 +32,212 @@ def test_websocket_broadcast(db_session):
         assert data["type"] == "WORKER_PLACED"
         assert data["worker_ids"] == [1]
         assert data["slot"] == "marketing"
+
+
+def test_broadcast_only_reaches_same_game(db_session):
+    with client.websocket_connect("/ws/2") as other_game:
+        with client.websocket_connect("/ws/1") as websocket:
+            client.post(
+                "/actions/place-worker",
+                json={
+                    "player_id": 1,
+                    "game_id": 1,
+                    "worker_ids": [2],
+                    "action_type": "marketing",
+                },
+            )
+            assert websocket.receive_json()["type"] == "WORKER_PLACED"
+
+        assert manager.rooms.get(2)
+        assert len(manager.rooms[2]) == 1
+        assert 1 not in manager.rooms
+
+
+def test_laggard_socket_is_disconnected():
+    class StalledSocket:
+        closed_with = None
+
+        async def accept(self):
+            pass
+
+        async def send_text(self, text):
+            await asyncio.Event().wait()  # never completes
+
+        async def close(self, code=1000):
+            self.closed_with = code
+
+    async def scenario():
+        room_manager = ConnectionManager(queue_size=2)
+        slow = StalledSocket()
+        await room_manager.connect(slow, game_id=7)
+        for i in range(5):
+            await room_manager.broadcast({"n": i}, game_id=7)
+        await asyncio.sleep(0)
+        return room_manager, slow
+
+    room_manager, slow = asyncio.run(scenario())
+    assert 7 not in room_manager.rooms
+    assert slow.closed_with == 1013
+
+
+def test_publish_from_worker_thread_fans_out_on_the_loop():
+    class RecordingSocket:
+        def __init__(self):
+            self.sent = []
+
+        async def accept(self):
+            pass
+
+        async def send_text(self, text):
+            self.sent.append(text)
+
+    async def scenario():
+        room_manager = ConnectionManager()
+        socket = RecordingSocket()
+        await room_manager.connect(socket, game_id=3)
+        loop_thread = threading.get_ident()
+
+        class LoopOnlyRooms(dict):
+            def get(self, *args):
+                assert threading.get_ident() == loop_thread
+                return super().get(*args)
+
+        room_manager.rooms = LoopOnlyRooms(room_manager.rooms)
+        await asyncio.to_thread(room_manager.publish, {"n": 1}, 3)
+        for _ in range(3):
+            await asyncio.sleep(0)
+        room_manager.disconnect(socket, game_id=3)
+        return socket.sent
+
+    assert asyncio.run(scenario()) == ['{"n": 1}']
+
+
+def test_state_delta_follows_worker_placement(db_session):
+    version = client.get("/game/1/state").json()["version"]
+
+    with client.websocket_connect("/ws/1") as websocket:
+        client.post(
+            "/actions/place-worker",
+            json={
+                "player_id": 1,
+                "game_id": 1,
+                "worker_ids": [3],
+                "action_type": "buy_chips",
+            },
+        )
+        assert websocket.receive_json()["type"] == "WORKER_PLACED"
+        delta = websocket.receive_json()
+
+    assert delta["type"] == "STATE_DELTA"
+    assert delta["version"] == version + 1
+    assert delta["placements_added"] == [
+        {"player_id": 1, "worker_number": 3, "action_type": "buy_chips"}
+    ]
+    assert client.get("/game/1/state").json()["version"] == version + 1
+
+
+def test_state_etag_answers_304_until_game_changes(db_session):
+    first = client.get("/game/1/state")
+    etag = first.headers["ETag"]
+
+    unchanged = client.get("/game/1/state", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+
+    client.post(
+        "/actions/place-worker",
+        json={
+            "player_id": 2,
+            "game_id": 1,
+            "worker_ids": [1],
+            "action_type": "recruit",
+        },
+    )
+    changed = client.get("/game/1/state", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["placements"][0]["action_type"] == "recruit"
+
+
+def count_state_queries(record_statements, game_id):
+    with record_statements() as statements:
+        assert client.get(f"/game/{game_id}/state").status_code == 200
+    return len(statements)
+
+
+def test_state_query_count_is_constant_in_player_count(db_session, record_statements):
+    two_players = count_state_queries(record_statements, 1)
+
+    for order in range(2, 5):
+        db_session.add(Player(user_name=f"P{order}", player_order=order, game_id=1))
+    db_session.commit()
+    for player in db_session.query(Player).all():
+        place_worker(db_session, player.id, 1, "marketing")
+    db_session.commit()
+
+    state = client.get("/game/1/state").json()
+    assert len(state["players"]) == 5
+    assert all(p["placed_worker_numbers"] == [1] for p in state["players"])
+    assert count_state_queries(record_statements, 1) == two_players == 6
+
+
+def test_state_matches_response_model(db_session):
+    card = draw_card(db_session, 1, ZoneType.RESEARCH_DECK)
+    db_session.commit()
+
+    response = client.get("/game/1/state")
+    assert response.headers["content-type"] == "application/json"
+    state = GameStateResponse.model_validate_json(response.content)
+
+    me = next(p for p in state.players if p.id == 1)
+    assert [c.id for c in me.hand] == [card["component_id"]]
+    assert len(state.regions) == 10
+    assert state.tiles
+
+
+def test_missing_game_state_is_404(db_session):
+    assert client.get("/game/999/state").status_code == 404
+
+
+def test_leaderboard_matches_response_model(db_session):
+    response = client.get("/game/1/leaderboard")
+    rows = [LeaderboardRow.model_validate(r) for r in response.json()]
+    assert sorted(r.player_id for r in rows) == [1, 2]
+
+
+def test_metrics_track_requests_commands_and_sockets(db_session):
+    route = "/actions/place-worker"
+    before = metrics.HTTP_LATENCY.count("POST", route, "200")
+    commands = metrics.ENGINE_LATENCY.count("place_worker")
+    commits = metrics.DB_COMMITS.value()
+    sockets = metrics.WS_CONNECTIONS.value("fastapi")
+
+    with client.websocket_connect("/ws/1") as websocket:
+        assert metrics.WS_CONNECTIONS.value("fastapi") == sockets + 1
+        client.post(
+            route,
+            json={
+                "player_id": 1,
+                "game_id": 1,
+                "worker_ids": [1],
+                "action_type": "marketing",
+            },
+        )
+        websocket.receive_json()
+
+    assert metrics.HTTP_LATENCY.count("POST", route, "200") == before + 1
+    assert metrics.ENGINE_LATENCY.count("place_worker") == commands + 1
+    assert metrics.DB_COMMITS.value() > commits
+
+    body = client.get("/metrics").text
+    assert "# TYPE disruptopia_http_request_duration_seconds histogram" in body
+    assert (
+        'disruptopia_http_request_duration_seconds_count{method="POST",'
+        f'route="{route}",status="200"}} {before + 1}'
+    ) in body
+    # The engine ran on the DB pool, but its statements count toward the request
+    sums = [
+        line
+        for line in body.splitlines()
+        if line.startswith(f'disruptopia_http_request_queries_sum{{route="{route}"}}')
+    ]
+    assert sums and float(sums[0].split()[-1]) > 0
@@ -0,0 +1,39 @@
+from benchmarks.engine_suite import (
+    BENCHMARKS,
+    find_regressions,
+    load_baselines,
+    run_suite,
+)
+
+
+def test_query_counts_match_baselines():
+    # Wall time and allocations are too noisy for CI; statement counts aren't
+    results = run_suite(iterations=1)
+    baselines = load_baselines()
+
+    assert results.keys() == {b.name for b in BENCHMARKS}
+    assert results.keys() <= baselines["benchmarks"].keys()
+    queries_only = {
+        name: {"queries": metrics["queries"]} for name, metrics in results.items()
+    }
+    assert find_regressions(queries_only, baselines) == []
+
+
+def test_thresholds_apply_per_metric_and_benchmark():
+    baselines = {
+        "thresholds": {"wall_ms": 2.0, "queries": 1.0},
+        "benchmarks": {
+            "a": {"wall_ms": 1.0, "queries": 4},
+            "b": {"wall_ms": 1.0, "queries": 4, "thresholds": {"wall_ms": 3.0}},
+        },
+    }
+    results = {
+        "a": {"wall_ms": 2.5, "queries": 5},
+        "b": {"wall_ms": 2.5, "queries": 4},
+        "new": {"wall_ms": 99, "queries": 99},
+    }
+
+    regressions = find_regressions(results, baselines)
+    assert len(regressions) == 2
+    assert all(line.startswith("a: ") for line in regressions)
+    assert find_regressions(results, baselines, {"wall_ms": 3.0, "queries": 2.0}) == []
@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import text
+
+from backend.database import (
+    SQLITE_PRAGMAS,
+    SchemaOutOfDate,
+    check_schema,
+    create_db_engine,
+    describe_database,
+    upgrade_schema,
+)
+from backend.models import Base
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+
+    report = describe_database(engine)
+
+    assert report["journal_mode"] == "wal"
+    assert report["synchronous"] == 1  # NORMAL
+    assert report["busy_timeout"] == SQLITE_PRAGMAS["busy_timeout"]
+    assert report["cache_size"] == SQLITE_PRAGMAS["cache_size"]
+    engine.dispose()
+
+
+def test_stale_schema_is_reported_and_upgraded(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # What an older release created: no shuffle columns, no event log
+        conn.execute(text("DROP TABLE game_events"))
+        conn.execute(text("ALTER TABLE games DROP COLUMN shuffle_count"))
+        conn.execute(text("ALTER TABLE games DROP COLUMN last_event_seq"))
+        conn.execute(text("INSERT INTO games VALUES (1, 0, 'setup', 0, 0, 0, 0, 0)"))
+
+    with pytest.raises(SchemaOutOfDate, match="games.shuffle_count"):
+        check_schema(engine)
+
+    upgrade_schema(engine)
+
+    check_schema(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT shuffle_count FROM games")).scalar() == 0
+        assert conn.execute(text("SELECT last_event_seq FROM games")).scalar() == 0
+    engine.dispose()
@@ -1,7 +1,13 @@
 import pytest
+from sqlalchemy import event
+
+from backend import game_engine
+
 from backend.database import SessionLocal, engine
+from backend.deltas import pop_committed
 from backend.models import (
     Base,
+    CardDetails,
     Component,
     Player,
     Game,
@@ -9,6 +15,7 @@ from backend.models import (
     Presence,
     RegionState,
     ReputationTile,
+    LeaderboardEntry,
 )
 
 # Updated imports to match new execute_ prefix and helper signatures
@@ -27,6 +34,7 @@ from backend.game_engine import (
     execute_marketing,
     check_reputation_tiles,
     calculate_game_leaderboard,
+    get_player_modifiers,
 )
 from backend.seed import ZoneType, seed_initial_game
 
@@ -201,6 +209,28 @@ def test_scale_presence_and_subsidy_depletion(db_session):
     assert "error" in res_b or player_b.subsidy_tokens == 0
 
 
+def test_presence_masks_load_once_and_follow_new_presence(
+    db_session, record_statements
+):
+    player = db_session.get(Player, 1)
+    db_session.add(Presence(player_id=player.id, region_id=1))
+    db_session.commit()
+
+    assert game_engine.expansion_options(db_session, player.id) == [2, 6]
+
+    with record_statements() as statements:
+        assert execute_scale_presence(db_session, player.id, 2)["action"]
+        assert execute_scale_presence(db_session, player.id, 3)["action"]
+
+    # The masks were already loaded; the second step sees the first
+    assert not [s for s in statements if "JOIN presence" in s]
+    assert game_engine.expansion_options(db_session, player.id) == [4, 6, 7, 8]
+    assert execute_scale_presence(db_session, player.id, 9) == {
+        "error": "Region not adjacent."
+    }
+    assert "error" in execute_scale_presence(db_session, player.id, 99)
+
+
 def test_net_worth_upgrade_and_income_boost(db_session):
     player = db_session.get(Player, 1)
     player.net_worth_level = 0
@@ -330,6 +360,51 @@ def test_reputation_tile_stealing_and_eligibility(db_session):
     assert penalty_tile is not None
 
 
+def test_reputation_tiles_load_the_game_once(db_session, record_statements):
+    player_a = db_session.get(Player, 1)
+    player_b = db_session.get(Player, 2)
+    player_a.reputation, player_b.reputation = 3, 2
+    db_session.commit()
+    check_reputation_tiles(db_session, player_b.id)
+    db_session.commit()
+
+    with record_statements() as statements:
+        check_reputation_tiles(db_session, player_a.id)
+
+    # Players and tiles are read once each; the steal is one bulk update
+    reads = [s for s in statements if s.startswith("SELECT")]
+    assert len([s for s in reads if "FROM reputation_tiles" in s]) == 1
+    assert len([s for s in statements if s.startswith("UPDATE")]) == 1
+    tile = db_session.query(ReputationTile).filter_by(level=1).one()
+    assert tile.owner_id == player_a.id
+
+
+def test_reputation_tiles_can_wait_for_the_end_of_the_round(db_session, monkeypatch):
+    monkeypatch.setattr(game_engine, "REPUTATION_TILES_AT_ROUND_END", True)
+    player_a = db_session.get(Player, 1)
+    player_b = db_session.get(Player, 2)
+    game_id = player_a.game_id
+    player_a.reputation, player_b.reputation = -3, 4
+    db_session.commit()
+
+    execute_marketing(db_session, player_b.id)
+    assert (
+        db_session.query(ReputationTile)
+        .filter(ReputationTile.owner_id.is_not(None))
+        .count()
+        == 0
+    )
+
+    place_worker(db_session, player_a.id, 1, "raise_funds")
+    resolve_entire_round(db_session, game_id)
+
+    owners = {}
+    for tile in db_session.query(ReputationTile).all():
+        owners.setdefault(tile.level, set()).add(tile.owner_id)
+    assert owners[0] == {player_a.id, None}
+    assert owners[1] == {player_b.id}
+
+
 def test_vp_calculation_and_funds_ranking(db_session):
     """Verifies that the 3-player fund bonus and Net Worth race VP work correctly."""
     game = db_session.query(Game).first()
@@ -366,3 +441,284 @@ def test_vp_calculation_and_funds_ranking(db_session):
 
     # Player 3 (3rd in funds): Funds(0)
     assert scores[p3.id]["breakdown"]["funds_bonus"] == 0
+
+
+def test_player_modifiers_cached_until_tiles_change(db_session, record_statements):
+    player = db_session.get(Player, 1)
+    tile = db_session.query(ReputationTile).filter_by(level=1).first()
+    tile.effect_code = "income_plus_1"
+    db_session.commit()
+
+    assert get_player_modifiers(db_session, player.id)["income_offset"] == 0
+
+    with record_statements() as statements:
+        get_player_modifiers(db_session, player.id)
+    assert statements == []
+
+    # Gaining the tile invalidates the cached modifiers
+    player.reputation = 1
+    db_session.commit()
+    check_reputation_tiles(db_session, player.id)
+
+    assert tile.owner_id == player.id
+    assert get_player_modifiers(db_session, player.id)["income_offset"] == 1
+
+
+def test_round_upkeep_applies_per_round_tile_effects(db_session):
+    player = db_session.get(Player, 1)
+    game_id = player.game_id
+    penalties = db_session.query(ReputationTile).filter_by(level=0).all()
+    penalties[0].effect_code = "lose_2_power_round"
+    penalties[1].effect_code = "discard_per_round"
+    for tile in penalties:
+        tile.owner_id = player.id
+    player.power = 5
+    db_session.commit()
+    drawn = [
+        draw_card(db_session, player.id, ZoneType.RESEARCH_DECK)["component_id"]
+        for _ in range(2)
+    ]
+    db_session.commit()
+
+    place_worker(db_session, 2, 1, "raise_funds")
+    resolve_entire_round(db_session, game_id)
+
+    assert player.power == 3
+    discarded = db_session.get(Component, min(drawn))
+    assert discarded.owner_id is None
+    assert discarded.zone.endswith("_discard")
+    hand = db_session.query(Component).filter_by(zone=f"hand_p{player.id}")
+    assert hand.count() == 1
+
+
+def test_free_active_effect_opens_a_fourth_slot(db_session):
+    player = db_session.get(Player, 1)
+    effect_card = (
+        db_session.query(Component)
+        .join(Component.card_details)
+        .filter(Component.zone.like("%deck"), CardDetails.is_effect.is_(True))
+        .first()
+    )
+    effect_card.zone, effect_card.owner_id = f"hand_p{player.id}", player.id
+    db_session.commit()
+
+    assert play_card(db_session, player.id, effect_card.id, 4) == {
+        "error": "Invalid slot."
+    }
+
+    tile = db_session.query(ReputationTile).filter_by(level=3).first()
+    tile.effect_code, tile.owner_id = "free_active_effect", player.id
+    db_session.commit()
+    result = play_card(db_session, player.id, effect_card.id, 4)
+    assert result["new_zone"] == f"active_effect_card_slot_4_p{player.id}"
+
+
+def test_game_modifiers_load_in_one_query(db_session, record_statements):
+    tile = db_session.query(ReputationTile).filter_by(level=1).first()
+    tile.effect_code, tile.owner_id = "income_plus_2", 1
+    db_session.commit()
+
+    with record_statements() as statements:
+        loaded = game_engine.load_game_modifiers(db_session, 1)
+        assert get_player_modifiers(db_session, 1)["income_offset"] == 2
+        assert get_player_modifiers(db_session, 2)["income_offset"] == 0
+
+    assert len(statements) == 1
+    assert sorted(loaded) == [1, 2]
+
+
+def test_modifiers_see_tiles_moved_by_another_session(db_session):
+    tile = db_session.query(ReputationTile).filter_by(level=1).first()
+    tile.effect_code = "income_plus_1"
+    db_session.commit()
+    assert get_player_modifiers(db_session, 1)["income_offset"] == 0
+    db_session.commit()
+
+    # Another worker process hands the tile to player 1
+    other = SessionLocal()
+    try:
+        other.get(ReputationTile, tile.id).owner_id = 1
+        other.commit()
+    finally:
+        other.close()
+
+    assert get_player_modifiers(db_session, 1)["income_offset"] == 1
+
+
+def test_round_resolution_loads_placements_once(db_session, record_statements):
+    players = db_session.query(Player).all()
+    game_id = players[0].game_id
+    for p in players:
+        p.total_workers = 8
+    db_session.commit()
+
+    for p in players:
+        for worker_number in range(1, 9):
+            place_worker(db_session, p.id, worker_number, "raise_funds")
+
+    with record_statements() as statements:
+        result = resolve_entire_round(db_session, game_id)
+
+    placement_reads = [
+        s
+        for s in statements
+        if s.startswith("SELECT") and "FROM worker_placements" in s
+    ]
+    assert len(placement_reads) == 1
+    assert result["query_count"] == len(statements)
+    assert result["elapsed_ms"] >= 0
+    assert db_session.query(WorkerPlacement).count() == 0
+
+
+def test_leaderboard_is_maintained_on_write(db_session, record_statements):
+    player = db_session.get(Player, 1)
+    game_id = player.game_id
+    player.power = 12
+    player.model_version = 2
+    db_session.commit()
+
+    standings = {row.player_id: row for row in db_session.query(LeaderboardEntry).all()}
+    assert standings[1].power_vp == 2
+    assert standings[1].model_vp == 2
+
+    with record_statements() as statements:
+        leaderboard = calculate_game_leaderboard(db_session, game_id)
+
+    assert len(statements) == 1
+    assert leaderboard[0]["player_id"] == 1
+    assert leaderboard[0]["total_vp"] == standings[1].total_vp
+
+
+def test_leaderboard_is_rebuilt_once_per_commit(db_session, record_statements):
+    for player_id in (1, 2):
+        place_worker(db_session, player_id, 1, "marketing")
+        place_worker(db_session, player_id, 2, "raise_funds")
+        place_worker(db_session, player_id, 3, "train_model")
+    db_session.commit()
+
+    with record_statements() as statements:
+        result = resolve_entire_round(db_session, 1)
+
+    rebuilds = [s for s in statements if s.startswith("DELETE FROM leaderboard")]
+    assert len(rebuilds) == 1
+    stored = calculate_game_leaderboard(db_session, 1)
+    assert result["leaderboard"] == stored
+
+
+def test_leaderboard_reads_do_not_write(db_session, record_statements):
+    player = db_session.get(Player, 1)
+    player.power = 20
+    db_session.flush()
+    # Not committed yet: computed from the players, not the stale rows
+    assert calculate_game_leaderboard(db_session, 1)[0]["breakdown"]["power_vp"] == 4
+    db_session.rollback()
+
+    db_session.query(LeaderboardEntry).delete()
+    db_session.commit()
+
+    with record_statements() as statements:
+        leaderboard = calculate_game_leaderboard(db_session, 1)
+
+    assert sorted(s["player_id"] for s in leaderboard) == [1, 2]
+    assert all(s.startswith("SELECT") for s in statements)
+    assert db_session.query(LeaderboardEntry).count() == 0
+
+
+def test_draw_pops_top_card_in_one_statement(db_session, record_statements):
+    top = (
+        db_session.query(Component)
+        .filter_by(zone=ZoneType.RESEARCH_DECK.value)
+        .order_by(Component.position)
+        .first()
+    )
+    player = db_session.get(Player, 1)
+    # The transaction's first command also finds its place in the event log
+    draw_card(db_session, player.id, ZoneType.INFLUENCE_DECK)
+
+    with record_statements() as statements:
+        result = draw_card(db_session, player.id, ZoneType.RESEARCH_DECK)
+
+    assert result["component_id"] == top.id
+    assert len(statements) == 1
+    assert top.zone == "hand_p1"
+
+
+def test_empty_deck_reshuffles_discard(db_session):
+    deck = db_session.query(Component).filter_by(zone="influence_deck").all()
+    for card in deck:
+        card.zone = "influence_discard"
+    db_session.commit()
+
+    result = draw_card(db_session, 1, ZoneType.INFLUENCE_DECK)
+
+    assert "error" not in result
+    assert db_session.query(Component).filter_by(zone="influence_discard").count() == 0
+    remaining = db_session.query(Component).filter_by(zone="influence_deck").all()
+    assert len(remaining) == len(deck) - 1
+    assert len({c.position for c in remaining}) == len(remaining)
+
+
+def test_round_commits_once(db_session):
+    players = db_session.query(Player).all()
+    game_id = players[0].game_id
+    for p in players:
+        for worker_number in range(1, 4):
+            place_worker(db_session, p.id, worker_number, "marketing")
+    db_session.commit()
+
+    commits = []
+
+    def record(session):
+        commits.append(session)
+
+    event.listen(db_session, "after_commit", record)
+    try:
+        resolve_entire_round(db_session, game_id)
+    finally:
+        event.remove(db_session, "after_commit", record)
+    assert len(commits) == 1
+
+
+def test_round_delta_clears_recruited_placements(db_session):
+    place_worker(db_session, 1, 1, "recruit")
+    db_session.commit()
+    pop_committed(db_session)
+
+    resolve_entire_round(db_session, 1)
+    (delta,) = pop_committed(db_session)
+
+    # The recruit's worker 4 was placed and resolved within the round
+    assert delta["players"][1]["total_workers"] == 4
+    assert delta["placements_cleared"]
+    assert delta["placements_added"] == []
+    assert delta["placements_removed"] == []
+
+
+def test_failed_round_rolls_back(db_session, monkeypatch):
+    players = db_session.query(Player).all()
+    game_id = players[0].game_id
+    for p in players:
+        place_worker(db_session, p.id, 1, "marketing")
+        place_worker(db_session, p.id, 2, "buy_chips")
+    db_session.commit()
+    before = {p.id: (p.reputation, p.power) for p in players}
+
+    real_execute = game_engine.execute_action
+
+    def fail_on_buy_chips(db, player_id, action_type, worker_count=1):
+        if action_type == "buy_chips":
+            raise RuntimeError("boom")
+        return real_execute(db, player_id, action_type, worker_count)
+
+    monkeypatch.setattr(game_engine, "execute_action", fail_on_buy_chips)
+    with pytest.raises(RuntimeError):
+        resolve_entire_round(db_session, game_id)
+
+    # The first player's marketing was flushed, but never committed
+    check = SessionLocal()
+    try:
+        after = {p.id: (p.reputation, p.power) for p in check.query(Player).all()}
+        assert after == before
+        assert check.query(WorkerPlacement).count() == 4
+    finally:
+        check.close()
@@ -0,0 +1,155 @@
+import functools
+import json
+import threading
+
+import pytest
+
+from sqlalchemy import select
+
+from backend import event_log
+from backend.database import SessionLocal, finish_command
+from backend.enums import ZoneType
+from backend.event_log import recover_game, replay
+from backend.game_engine import (
+    draw_card,
+    execute_buy_chips,
+    place_worker,
+    resolve_entire_round,
+)
+from backend.models import Component, GameEvent, GameSnapshot, Player
+
+
+def player_rows(db, game_id):
+    return [
+        (p.id, p.power, p.reputation, p.corporate_funds, p.compute_level)
+        for p in db.execute(
+            select(Player).where(Player.game_id == game_id).order_by(Player.id)
+        ).scalars()
+    ]
+
+
+def play_some_commands(db):
+    for player_id in (1, 2):
+        place_worker(db, player_id, 1, "marketing")
+        place_worker(db, player_id, 2, "raise_funds")
+    db.commit()
+    draw_card(db, 1, ZoneType.RESEARCH_DECK)
+    db.commit()
+    resolve_entire_round(db, 1)
+
+
+def test_commands_are_logged_in_order(db_session):
+    play_some_commands(db_session)
+    # Returns an error (not enough funds), so it is not logged
+    db_session.get(Player, 2).corporate_funds = 0
+    execute_buy_chips(db_session, 2)
+    db_session.commit()
+
+    events = db_session.scalars(select(GameEvent).order_by(GameEvent.seq)).all()
+    assert [e.seq for e in events] == list(range(1, 7))
+    # The round's own actions replay as part of the round
+    assert [e.command for e in events][-2:] == ["draw_card", "resolve_entire_round"]
+    assert json.loads(events[4].args) == {"player_id": 1, "deck_type": "research_deck"}
+    assert db_session.scalars(select(GameSnapshot.seq)).all() == [0]
+
+
+def test_concurrent_commands_get_distinct_numbers(db_session):
+    barrier = threading.Barrier(6)
+    failures = []
+
+    def place(player_id, worker_number):
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            finish_command(db, place_worker(db, player_id, worker_number, "marketing"))
+        except Exception as exc:
+            failures.append(exc)
+        finally:
+            db.close()
+
+    threads = [
+        threading.Thread(target=place, args=(player_id, worker_number))
+        for player_id in (1, 2)
+        for worker_number in (1, 2, 3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+    seqs = db_session.scalars(select(GameEvent.seq).order_by(GameEvent.seq)).all()
+    assert seqs == list(range(1, 7))
+
+
+def test_recover_rebuilds_from_snapshot_and_log(db_session, monkeypatch):
+    monkeypatch.setattr(event_log, "SNAPSHOT_EVERY", 4)
+    play_some_commands(db_session)
+    expected = player_rows(db_session, 1)
+    hand = db_session.scalars(
+        select(Component.id).where(Component.zone == "hand_p1")
+    ).all()
+
+    # Clobber the live rows
+    for player in db_session.query(Player).all():
+        player.power = 0
+    db_session.commit()
+
+    result = recover_game(db_session, 1)
+    assert result["snapshot_seq"] == 4
+    assert result["events_replayed"] == 2
+    assert player_rows(db_session, 1) == expected
+    assert (
+        db_session.scalars(
+            select(Component.id).where(Component.zone == "hand_p1")
+        ).all()
+        == hand
+    )
+
+
+def test_failed_recovery_leaves_the_game_untouched(db_session, monkeypatch):
+    play_some_commands(db_session)
+    draw_card(db_session, 2, ZoneType.RESEARCH_DECK)
+    db_session.commit()
+    for player in db_session.query(Player).all():
+        player.power = 0
+    db_session.commit()
+    before = player_rows(db_session, 1)
+
+    # The draw after the round fails to replay
+    real_draw = event_log.COMMANDS["draw_card"]
+    calls = []
+
+    @functools.wraps(real_draw)  # Keeps the signature apply_event reads
+    def flaky_draw(db, **kwargs):
+        calls.append(kwargs)
+        if len(calls) == 2:
+            raise RuntimeError("disk on fire")
+        return real_draw(db, **kwargs)
+
+    monkeypatch.setitem(event_log.COMMANDS, "draw_card", flaky_draw)
+    with pytest.raises(RuntimeError):
+        recover_game(db_session, 1)
+
+    assert player_rows(db_session, 1) == before
+    assert db_session.scalars(select(GameEvent.seq)).all() == list(range(1, 8))
+
+
+def test_replay_streams_history_without_touching_the_game(db_session):
+    play_some_commands(db_session)
+    expected = player_rows(db_session, 1)
+
+    steps = replay(db_session, 1)
+    first = next(steps)
+    assert (first.seq, first.command) == (1, "place_worker")
+    assert first.result["action"] == "worker_placed"
+
+    for step in steps:
+        replayed = player_rows(step.session, 1)
+    assert step.command == "resolve_entire_round"
+    assert replayed == expected
+    assert player_rows(db_session, 1) == expected
+
+    # A fresh replay can stop part-way through the history
+    partial = list(replay(db_session, 1, up_to=4))
+    assert [step.seq for step in partial] == [1, 2, 3, 4]
@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import select
+
+from backend.models import (
+    Component,
+    LeaderboardEntry,
+    Player,
+    Presence,
+    RegionState,
+    ReputationTile,
+    WorkerPlacement,
+)
+
+# The filters the engine runs on every action, each paired with the index
+# that should serve it.
+HOT_QUERIES = {
+    "ix_components_deck_order": select(Component.id)
+    .where(Component.game_id == 1, Component.zone == "research_deck")
+    .order_by(Component.position)
+    .limit(1),
+    "ix_components_owner_zone": select(Component.id).where(
+        Component.owner_id == 1, Component.zone == "hand_p1"
+    ),
+    "uq_placement_worker": select(WorkerPlacement).where(
+        WorkerPlacement.game_id == 1,
+        WorkerPlacement.player_id == 1,
+        WorkerPlacement.worker_number == 1,
+    ),
+    "ix_reputation_tiles_owner": select(ReputationTile).where(
+        ReputationTile.owner_id == 1
+    ),
+    "ix_reputation_tiles_level_owner": select(ReputationTile).where(
+        ReputationTile.game_id == 1,
+        ReputationTile.level == 0,
+        ReputationTile.owner_id.is_(None),
+    ),
+    "uq_presence_region": select(Presence).where(
+        Presence.player_id == 1, Presence.region_id == 2
+    ),
+    "uq_region_state": select(RegionState).where(
+        RegionState.game_id == 1, RegionState.region_id == 2
+    ),
+    "ix_players_game_id": select(Player).where(Player.game_id == 1),
+    "ix_leaderboard_game_total": select(LeaderboardEntry)
+    .where(LeaderboardEntry.game_id == 1)
+    .order_by(LeaderboardEntry.total_vp.desc()),
+}
+
+
+@pytest.mark.parametrize("index_name", HOT_QUERIES)
+def test_hot_query_uses_index(db_session, index_name):
+    query = HOT_QUERIES[index_name]
+    sql = str(
+        query.compile(
+            dialect=db_session.get_bind().dialect,
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+
+    plan = db_session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    details = " | ".join(row[-1] for row in plan)
+
+    assert index_name in details, details
@@ -0,0 +1,38 @@
+import pytest
+
+from backend import modifiers
+from backend.config import MODIFIER_DEFAULTS, REPUTATION_TILE_POOL
+
+
+def test_every_tile_in_the_pool_has_an_effect():
+    for tiles in REPUTATION_TILE_POOL.values():
+        for tile in tiles:
+            assert tile["effect"] in modifiers.EFFECT_VECTORS
+
+
+def test_effects_add_up_and_flags_turn_on():
+    assert modifiers.as_dict(modifiers.total([])) == MODIFIER_DEFAULTS
+
+    mods = modifiers.as_dict(
+        modifiers.total(["income_plus_1", "income_plus_2", "perma_p1", "unknown"])
+    )
+    assert mods["income_offset"] == 3
+    assert mods["priority_p1"] is True
+    assert mods["free_card_play"] is False
+
+    # The penalty and the bonus stack: 5 - 2 + 1
+    mods = modifiers.as_dict(modifiers.total(["hand_limit_3", "hand_limit_6"]))
+    assert mods["hand_limit"] == 4
+
+
+def test_batch_evaluation_covers_players_without_tiles():
+    rows = [(1, "compute_minus_1"), (1, "compute_minus_2"), (2, None), (3, "perma_p1")]
+    result = modifiers.evaluate(rows)
+    assert result[1]["compute_cost_offset"] == -3
+    assert result[2] == MODIFIER_DEFAULTS
+    assert result[3]["priority_p1"] is True
+
+
+def test_unknown_modifier_names_are_rejected():
+    with pytest.raises(ValueError):
+        modifiers.compile_effects({"typo": {"incom_offset": 1}})
@@ -0,0 +1,80 @@
+import pstats
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import profiling
+from backend.main import app
+
+client = TestClient(app)
+TOKEN = "let-me-profile"
+
+
+@pytest.fixture
+def profile_dir(tmp_path):
+    original = profiling.PROFILE_TOKEN, profiling.PROFILE_DIR
+    profiling.configure(TOKEN, str(tmp_path))
+    yield tmp_path
+    profiling.configure(*original)
+
+
+def functions(path) -> set[str]:
+    return {name for _, _, name in pstats.Stats(str(path)).stats}
+
+
+def test_flagged_request_is_profiled_in_its_worker_thread(db_session, profile_dir):
+    response = client.post(
+        "/actions/place-worker",
+        json={
+            "player_id": 1,
+            "game_id": 1,
+            "worker_ids": [1],
+            "action_type": "marketing",
+        },
+        headers={"X-Profile": TOKEN},
+    )
+    assert response.status_code == 200
+    name = response.headers["X-Profile-Output"]
+    assert "POST_actions_place-worker" in name
+    assert "place_worker" in functions(profile_dir / name)
+
+    listing = client.get("/admin/profiles", headers={"X-Profile": TOKEN}).json()
+    assert [p["name"] for p in listing] == [name]
+    download = client.get(f"/admin/profiles/{name}", headers={"X-Profile": TOKEN})
+    assert download.content == (profile_dir / name).read_bytes()
+
+
+def test_query_flag_profiles_sync_endpoints(db_session, profile_dir):
+    response = client.get(f"/game/1/state?profile={TOKEN}")
+    assert response.status_code == 200
+    name = response.headers["X-Profile-Output"]
+    assert "read_state_view" in functions(profile_dir / name)
+
+
+def test_unflagged_and_wrong_tokens_are_not_profiled(db_session, profile_dir):
+    assert "X-Profile-Output" not in client.get("/game/1/state").headers
+    wrong = client.get("/game/1/state", headers={"X-Profile": "guess"})
+    assert "X-Profile-Output" not in wrong.headers
+    assert not list(profile_dir.iterdir())
+
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles/../x.prof").status_code == 404
+
+
+def test_profiling_is_off_without_a_token(db_session, profile_dir):
+    profiling.configure(None)
+    response = client.get("/game/1/state", headers={"X-Profile": TOKEN})
+    assert "X-Profile-Output" not in response.headers
+    assert client.get("/admin/profiles").status_code == 404
+
+
+def test_socket_events_profile_when_the_payload_asks(profile_dir):
+    @profiling.profiled_event("ping")
+    def handler(data):
+        return sum(range(1000))
+
+    handler({"profile": TOKEN})
+    handler({})
+    (saved,) = profile_dir.iterdir()
+    assert "ping" in saved.name
+    assert "handler" in functions(saved)
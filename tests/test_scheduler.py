@@ -0,0 +1,44 @@
+from backend.game_engine import place_worker
+from backend.models import Game, Player, WorkerPlacement
+from backend.scheduler import ResolverPool, find_ready_games, resolve_games
+
+
+def place_all_workers(db, action_type="raise_funds"):
+    for player in db.query(Player).all():
+        for worker_number in range(1, player.total_workers + 1):
+            place_worker(db, player.id, worker_number, action_type)
+
+
+def test_find_ready_games_requires_every_worker(db_session):
+    assert find_ready_games(db_session) == []
+
+    place_all_workers(db_session)
+    assert find_ready_games(db_session) == [1]
+
+    db_session.query(WorkerPlacement).filter_by(player_id=2).delete()
+    db_session.commit()
+    assert find_ready_games(db_session) == []
+
+
+def test_resolve_games_in_process_pool(db_session):
+    place_all_workers(db_session)
+    db_session.commit()
+
+    pool = ResolverPool(max_workers=1)
+    try:
+        summary = resolve_games(pool=pool)
+        executor = pool.executor
+        # Nothing is ready any more, and the same workers serve later batches
+        assert resolve_games(pool=pool)["games_resolved"] == 0
+        assert resolve_games([1], pool=pool)["games_resolved"] == 1
+        assert pool.executor is executor
+    finally:
+        pool.shutdown()
+
+    assert summary["games_resolved"] == 1
+    assert summary["results"][0]["game_id"] == 1
+    assert summary["results"][0]["result"]["action"] == "round_resolved"
+
+    db_session.expire_all()
+    assert db_session.query(WorkerPlacement).count() == 0
+    assert db_session.get(Game, 1).p1_token_index == 0  # Two rounds, two players
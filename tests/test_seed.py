@@ -0,0 +1,86 @@
+from sqlalchemy import func, select
+
+from backend.config import CARD_LIBRARY
+from backend.models import CardDetails, Component, Player, RegionState, ReputationTile
+from backend.seed import clone_game, create_game, create_games
+
+
+def deck_layout(db, game_id):
+    """{zone: [card name ordered by position]} for the game's decks."""
+    layout = {}
+    for row in db.execute(
+        select(Component.zone, Component.name)
+        .where(Component.game_id == game_id)
+        .order_by(Component.zone, Component.position)
+    ):
+        layout.setdefault(row.zone, []).append(row.name)
+    return layout
+
+
+def count(db, model, game_id):
+    return db.scalar(select(func.count()).where(model.game_id == game_id))
+
+
+def test_second_game_reuses_card_definitions(db_session):
+    game_id = create_game(db_session, player_count=4)
+    db_session.commit()
+
+    assert db_session.scalar(select(func.count(CardDetails.id))) == len(CARD_LIBRARY)
+    assert count(db_session, Player, game_id) == 4
+    assert count(db_session, Component, game_id) == sum(c["qty"] for c in CARD_LIBRARY)
+    tokens = db_session.scalars(
+        select(RegionState.subsidy_tokens_remaining).where(
+            RegionState.game_id == game_id
+        )
+    ).all()
+    assert tokens == [2] * 10
+
+
+def test_same_seed_deals_the_same_game(db_session):
+    first = create_game(db_session, rng_seed=7)
+    second = create_game(db_session, rng_seed=7)
+
+    assert deck_layout(db_session, first) == deck_layout(db_session, second)
+    tile_names = lambda game_id: db_session.scalars(
+        select(ReputationTile.name)
+        .where(ReputationTile.game_id == game_id)
+        .order_by(ReputationTile.id)
+    ).all()
+    assert tile_names(first) == tile_names(second)
+
+
+def test_clone_copies_rows_and_reshuffles_decks(db_session):
+    template_id = create_game(db_session, player_count=3, rng_seed=1)
+    clone_id = clone_game(db_session, template_id, rng_seed=2)
+
+    for model in (Player, RegionState, ReputationTile, Component):
+        assert count(db_session, model, clone_id) == count(
+            db_session, model, template_id
+        )
+
+    template = deck_layout(db_session, template_id)
+    clone = deck_layout(db_session, clone_id)
+    assert template.keys() == clone.keys()
+    for zone in template:
+        assert sorted(clone[zone]) == sorted(template[zone])
+    assert clone != template
+
+    for zone, cards in clone.items():
+        positions = db_session.scalars(
+            select(Component.position)
+            .where(Component.game_id == clone_id, Component.zone == zone)
+            .order_by(Component.position)
+        ).all()
+        assert positions == list(range(len(cards)))
+
+
+def test_create_games_in_bulk(db_session):
+    game_ids = create_games(db_session, 20, player_count=5, rng_seed=3)
+
+    assert len(set(game_ids)) == 20
+    assert (
+        db_session.scalar(
+            select(func.count(Player.id)).where(Player.game_id.in_(game_ids))
+        )
+        == 100
+    )
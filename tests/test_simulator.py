@@ -0,0 +1,31 @@
+from backend.simulator import LatencyHistogram, Simulation, simulate
+
+
+def test_histogram_percentiles_and_merge():
+    fast, slow = LatencyHistogram(), LatencyHistogram()
+    for _ in range(99):
+        fast.record(0.0005)  # 500us -> the 256-512us bucket
+    slow.record(0.1)
+    fast.merge(slow)
+
+    assert fast.count == 100
+    assert fast.percentile(50) == 0.512
+    assert fast.percentile(100) == 131.072
+    assert fast.summary()["max_ms"] == 100.0
+
+
+def test_simulation_plays_whole_games():
+    report = simulate(2, player_count=3, policy="mixed", seed=5, max_rounds=2)
+
+    assert report["games"] == 2
+    assert report["rounds"] == 4
+    assert report["games_per_second"] > 0
+    assert report["latency"]["resolve_entire_round"]["count"] == 4
+    assert report["latency"]["place_worker"]["count"] >= 2 * 2 * 3 * 3
+
+
+def test_greedy_policy_plays_every_round():
+    sim = Simulation("greedy", seed=1).run(1, 2, max_rounds=4)
+
+    assert sim.rounds == 4
+    assert sim.latency["place_worker"].count > 0
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import tracing
+from backend.game_engine import execute_marketing
+from backend.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    original = tracing.TRACE_FILE, tracing.TRACE_SAMPLE_RATE
+    tracing.configure(path=str(path), sample_rate=1.0)
+    yield path
+    tracing.configure(*original)
+
+
+def read_traces(path) -> list[list[dict]]:
+    traces = []
+    for line in path.read_text().splitlines():
+        request = json.loads(line)
+        (resource,) = request["resourceSpans"]
+        (scope,) = resource["scopeSpans"]
+        traces.append(scope["spans"])
+    return traces
+
+
+def children(spans: list[dict], parent: dict) -> list[dict]:
+    return [s for s in spans if s.get("parentSpanId") == parent["spanId"]]
+
+
+def test_http_request_traces_engine_and_sql_spans(db_session, trace_file):
+    response = client.post(
+        "/actions/place-worker",
+        json={
+            "player_id": 1,
+            "game_id": 1,
+            "worker_ids": [1],
+            "action_type": "marketing",
+        },
+    )
+    assert response.status_code == 200
+
+    (spans,) = read_traces(trace_file)
+    assert len({s["traceId"] for s in spans}) == 1
+    (root,) = [s for s in spans if "parentSpanId" not in s]
+    assert root["name"] == "POST /actions/place-worker"
+    assert root["kind"] == tracing.KIND_SERVER
+
+    # The engine ran on the DB thread pool but still hangs off the request
+    (command,) = [s for s in children(spans, root) if s["name"] == "place_worker"]
+    statements = children(spans, command)
+    assert statements and all(s["kind"] == tracing.KIND_CLIENT for s in statements)
+    assert {a["key"] for a in statements[0]["attributes"]} >= {
+        "db.system",
+        "db.statement",
+    }
+    for s in spans:
+        assert int(s["startTimeUnixNano"]) <= int(s["endTimeUnixNano"])
+
+
+def test_engine_calls_nest_inside_their_caller(db_session, trace_file):
+    with tracing.start_trace("test"):
+        execute_marketing(db_session, 1)
+
+    (spans,) = read_traces(trace_file)
+    (command,) = [s for s in spans if s["name"] == "execute_marketing"]
+    names = [s["name"] for s in children(spans, command)]
+    assert "update_player_income" in names
+    assert "check_reputation_tiles" in names
+
+
+def test_unsampled_requests_write_nothing(db_session, trace_file):
+    tracing.configure(sample_rate=0)
+    client.get("/game/1/state")
+    with tracing.start_trace("test") as root:
+        execute_marketing(db_session, 1)
+    assert root is None
+    assert not trace_file.exists()
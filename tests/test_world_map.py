@@ -0,0 +1,35 @@
+from backend.config import WORLD_MAP
+from backend.world_map import WORLD, WorldMap, grid_map, mask_of, regions_in
+
+
+def test_standard_board_is_a_two_by_five_grid():
+    assert {r: sorted(n) for r, n in grid_map(2, 5).items()} == {
+        r: sorted(n) for r, n in WORLD_MAP.items()
+    }
+    assert WORLD.adjacent(1, 2) and WORLD.adjacent(1, 6)
+    assert not WORLD.adjacent(1, 7)
+    assert not WORLD.adjacent(1, 11) and not WORLD.adjacent(0, 1)
+
+
+def test_frontier_grows_incrementally():
+    presence = frontier = 0
+    for region in (3, 8, 9):
+        presence, frontier = WORLD.expand(presence, frontier, region)
+        assert frontier == WORLD.frontier(presence)
+    assert regions_in(presence) == [3, 8, 9]
+    assert regions_in(frontier) == [2, 4, 7, 10]
+
+
+def test_hop_distances():
+    assert WORLD.distance(1, 1) == 0
+    assert WORLD.distance(1, 10) == 5
+    assert WORLD.distance(6, 3) == 3
+    split = WorldMap({1: [2], 2: [1], 3: []})
+    assert split.distance(1, 3) is None
+
+
+def test_large_maps_go_past_64_regions():
+    board = WorldMap(grid_map(20, 20))
+    assert board.distance(1, 400) == 38
+    presence = mask_of([210])
+    assert regions_in(board.frontier(presence)) == [190, 209, 211, 230]